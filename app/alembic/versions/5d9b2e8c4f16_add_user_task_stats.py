@@ -0,0 +1,38 @@
+"""add user task stats
+
+Revision ID: 5d9b2e8c4f16
+Revises: c3e7a1f09b52
+Create Date: 2026-10-18 12:20:45.913208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9b2e8c4f16'
+down_revision: Union[str, Sequence[str], None] = 'c3e7a1f09b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_task_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('completed', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # backfill from the existing tasks
+    op.execute("INSERT INTO user_task_stats (user_id, total, completed) "
+               "SELECT user_id, count(*), sum(CASE WHEN is_completed THEN 1 ELSE 0 END) "
+               "FROM tasks WHERE user_id IS NOT NULL GROUP BY user_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_task_stats')
@@ -0,0 +1,29 @@
+"""add tasks keyset pagination index
+
+Revision ID: 8f2c41d7a9b3
+Revises: 513bcc132482
+Create Date: 2026-10-18 09:12:41.530117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2c41d7a9b3'
+down_revision: Union[str, Sequence[str], None] = '513bcc132482'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_user_id_is_completed_created_date_id', 'tasks',
+                    ['user_id', 'is_completed', 'created_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_user_id_is_completed_created_date_id', table_name='tasks')
@@ -0,0 +1,53 @@
+"""add tasks full text search
+
+Revision ID: c3e7a1f09b52
+Revises: 8f2c41d7a9b3
+Create Date: 2026-10-18 11:02:17.284413
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e7a1f09b52'
+down_revision: Union[str, Sequence[str], None] = '8f2c41d7a9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+                   "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED")
+        op.create_index('ix_tasks_search_vector', 'tasks', ['search_vector'], unique=False, postgresql_using='gin')
+    elif dialect == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, content='tasks', content_rowid='id')")
+        op.execute("CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+                   "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END")
+        op.execute("CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+                   "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+                   "VALUES ('delete', old.id, old.title, old.description); END")
+        op.execute("CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+                   "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+                   "VALUES ('delete', old.id, old.title, old.description); "
+                   "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END")
+        # index the rows that already exist
+        op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_tasks_search_vector', table_name='tasks', postgresql_using='gin')
+        op.drop_column('tasks', 'search_vector')
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS tasks_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS tasks_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS tasks_fts_ai")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
@@ -1,22 +1,25 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from app.users.models import UserModel
-from app.core.database import get_db
-from sqlalchemy.orm import Session
+from app.auth.hashing import password_hasher
+from app.core.database import get_async_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 security = HTTPBasic()
 
 
-def get_current_username(credentials: HTTPBasicCredentials = Depends(security),
-                         db: Session = Depends(get_db)):
-    user_object = db.query(UserModel).filter_by(username=credentials.username).first()
+async def get_current_username(credentials: HTTPBasicCredentials = Depends(security),
+                               db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(UserModel).filter_by(username=credentials.username))
+    user_object = result.scalars().first()
     if not user_object:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Incorrect username or password",
                             headers={"WWW-Authenticate": "Basic"},
                             )
-    if not user_object.verify_password(credentials.password):
+    if not await password_hasher.verify(credentials.password, user_object.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Incorrect username or password",
                             headers={"WWW-Authenticate": "Basic"},
@@ -1,18 +1,25 @@
 from fastapi import Depends, HTTPException, status, FastAPI
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from app.users.models import UserModel, TokenModel
-from app.core.database import get_db
-from sqlalchemy.orm import Session
+from app.core.database import get_async_db
+from app.auth.tokens import utcnow
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 security = HTTPBearer(scheme_name="Token")
 
 
-def get_current_username(credentials: HTTPAuthorizationCredentials = Depends(security),
-                         db: Session = Depends(get_db)):
-    token_object = db.query(TokenModel).filter_by(token=credentials.credentials).first()
-    if not token_object:
+async def get_current_username(credentials: HTTPAuthorizationCredentials = Depends(security),
+                               db: AsyncSession = Depends(get_async_db)):
+    # one joined query for token and user, served by the unique index on tokens.token
+    result = await db.execute(select(UserModel)
+                              .join(TokenModel, TokenModel.user_id == UserModel.id)
+                              .where(TokenModel.token == credentials.credentials,
+                                     or_(TokenModel.expires_at.is_(None), TokenModel.expires_at > utcnow())))
+    user_object = result.scalars().first()
+    if not user_object:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Authentication Failed.",
                             )
-    return token_object.user
+    return user_object
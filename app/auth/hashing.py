@@ -0,0 +1,58 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.instrumentation import record_timing
+from app.users.models import pwd_context
+
+
+class PasswordHasher:
+    """Runs bcrypt hashing/verification on a dedicated thread pool.
+
+    bcrypt releases the GIL while hashing, so threads are enough to keep the
+    event loop free. At most `max_pending` calls may be queued or running; any
+    call beyond that is rejected with 503 so a login storm cannot pile up
+    unbounded work behind the pool.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="password-hasher")
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Server is busy, please try again later.",
+                                headers={"Retry-After": "1"})
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            record_timing("password-hash", time.perf_counter() - started)
+
+    async def hash(self, plain_password: str) -> str:
+        return await self._run(pwd_context.hash, plain_password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(pwd_context.verify, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(max_workers=settings.PASSWORD_HASH_WORKERS,
+                                 max_pending=settings.PASSWORD_HASH_MAX_PENDING)
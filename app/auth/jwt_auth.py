@@ -1,23 +1,29 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from app.users.models import UserModel, TokenModel
-from app.core.database import get_db
-from sqlalchemy.orm import Session
+from app.core.database import get_async_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
 import jwt
 from jwt.exceptions import InvalidSignatureError, DecodeError, ExpiredSignatureError
 from app.core.config import settings
+from app.auth.principal import Principal, principal_cache
+from app.core.metrics import AUTH_FAILURES
+from app.auth.tokens import revocation_list
+import uuid
 
 
 security = HTTPBearer(auto_error=False)
 
 
-def get_authenticated_user(
+async def get_authenticated_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-):
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
     # 1) Missing/malformed credentials -> 401 with WWW-Authenticate: Bearer
     if credentials is None or (credentials.scheme or "").lower() != "bearer":
+        AUTH_FAILURES.labels("missing_credentials").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required: missing or invalid Authorization header.",
@@ -32,49 +38,73 @@ def get_authenticated_user(
         # 3) Validate claims & type
         user_id = decoded.get("id")
         if user_id is None:
+            AUTH_FAILURES.labels("missing_user_id").inc()
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Authentication failed: user_id missing in token.",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         if decoded.get("type") != "access":
+            AUTH_FAILURES.labels("wrong_token_type").inc()
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Authentication failed: wrong token type.",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # 4) Load user
-        user_object = db.query(UserModel).filter_by(id=user_id).first()
-        # Token points to no user -> treat as invalid credentials -> 401
-        if user_object is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication failed: user not found.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        # 4) Revoked (logged out) tokens, checked against the worker's in-memory list
+        jti = decoded.get("jti")
+        if jti is not None:
+            await revocation_list.sync(db)
+            if revocation_list.is_revoked(jti):
+                AUTH_FAILURES.labels("revoked").inc()
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Authentication failed: token revoked.",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+
+        # 5) Load user (id/is_active only), served from the principal cache when possible
+        principal = principal_cache.get(user_id)
+        if principal is None:
+            result = await db.execute(select(UserModel.id, UserModel.is_active).filter_by(id=user_id))
+            row = result.first()
+            # Token points to no user -> treat as invalid credentials -> 401
+            if row is None:
+                AUTH_FAILURES.labels("user_not_found").inc()
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Authentication failed: user not found.",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            principal = Principal(id=row.id, is_active=bool(row.is_active))
+            principal_cache.set(principal)
         # User exists but is not allowed (e.g., inactive/banned) -> 403
-        if hasattr(user_object, "is_active") and not user_object.is_active:
+        if not principal.is_active:
+            AUTH_FAILURES.labels("inactive_user").inc()
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Forbidden: user is inactive.",
             )
 
-        return user_object
+        return principal
 
     except ExpiredSignatureError:
+        AUTH_FAILURES.labels("token_expired").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication failed: token expired.",
             headers={"WWW-Authenticate": "Bearer"},
         )
     except InvalidSignatureError:
+        AUTH_FAILURES.labels("invalid_signature").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication failed: invalid signature.",
             headers={"WWW-Authenticate": "Bearer"},
         )
     except DecodeError:
+        AUTH_FAILURES.labels("decode_error").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication failed: token decode error.",
@@ -84,6 +114,7 @@ def get_authenticated_user(
         # re-raise structured HTTP errors
         raise
     except Exception as e:
+        AUTH_FAILURES.labels("other").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Authentication failed: {e}.",
@@ -99,7 +130,9 @@ def generate_access_token(id: int,
         "type": "access",
         "id": id,
         "iat": now,
-        "exp": now + timedelta(seconds=expires_in)
+        "exp": now + timedelta(seconds=expires_in),
+        # identifies the token for revocation
+        "jti": uuid.uuid4().hex,
     }
 
     return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm="HS256")
@@ -112,14 +145,16 @@ def generate_refresh_token(id: int,
         "type": "refresh",
         "id": id,
         "iat": now,
-        "exp": now + timedelta(seconds=expires_in)
+        "exp": now + timedelta(seconds=expires_in),
+        # identifies the token for revocation
+        "jti": uuid.uuid4().hex,
     }
 
     return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm="HS256")
 
 
 def decode_refresh_token(token: str,
-                         db: Session = Depends(get_db)):
+                         db: AsyncSession = Depends(get_async_db)):
     try:
         decoded = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms="HS256")
         user_id = decoded.get("id", None)
@@ -129,6 +164,9 @@ def decode_refresh_token(token: str,
         if decoded.get("type") != "refresh":
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                                 detail="Authentication failed, wrong token authentication type.")
+        if revocation_list.is_revoked(decoded.get("jti")):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                                detail="Authentication failed, token revoked.")
         if datetime.now() > datetime.fromtimestamp(decoded.get("exp")):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                                 detail="Authentication failed, token expired.")
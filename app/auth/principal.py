@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+from app.core.config import settings
+from app.users.models import UserModel
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Lightweight authenticated user handed to route handlers instead of an ORM row."""
+    id: int
+    is_active: bool
+
+
+class PrincipalCache:
+    """Thread-safe TTL + LRU cache of principals keyed by user id."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return None
+            principal, expires_at = item
+            if expires_at < time.monotonic():
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+            return principal
+
+    def set(self, principal: Principal) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[principal.id] = (principal, time.monotonic() + self.ttl)
+            self._items.move_to_end(principal.id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._items.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+principal_cache = PrincipalCache(maxsize=settings.PRINCIPAL_CACHE_SIZE,
+                                 ttl=settings.PRINCIPAL_CACHE_TTL)
+
+
+# any ORM flush that changes or removes a user (deactivation included) drops its
+# cached principal; bulk UPDATE statements must call principal_cache.invalidate
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def invalidate_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
@@ -0,0 +1,87 @@
+"""JWT revocation and the lifecycle of stored tokens."""
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import upsert_insert
+from app.users.models import RevokedTokenModel, TokenModel
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class RevocationList:
+    """Revoked jti of this worker, checked in memory on every authenticated request.
+
+    Revocations made by other workers are loaded from revoked_tokens at most every
+    `sync_seconds`, incrementally by id; the last `overlap` ids are read again so a
+    row whose transaction committed after a higher id was seen is not missed.
+    """
+
+    def __init__(self, sync_seconds: float, overlap: int = 100):
+        self.sync_seconds = sync_seconds
+        self.overlap = overlap
+        self._revoked: Dict[str, float] = {}
+        self._last_id = 0
+        self._synced_at: Optional[float] = None
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def add(self, jti: str, expires_at: float) -> None:
+        self._revoked[jti] = expires_at
+
+    async def sync(self, db: AsyncSession, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._synced_at is not None and now - self._synced_at < self.sync_seconds:
+            return
+        # set first, concurrent requests of this worker do not pile up on the same query
+        self._synced_at = now
+        result = await db.execute(select(RevokedTokenModel.id, RevokedTokenModel.jti, RevokedTokenModel.expires_at)
+                                  .where(RevokedTokenModel.id > max(self._last_id - self.overlap, 0),
+                                         RevokedTokenModel.expires_at > utcnow())
+                                  .order_by(RevokedTokenModel.id))
+        for row in result.all():
+            self._revoked[row.jti] = row.expires_at.replace(tzinfo=timezone.utc).timestamp()
+            self._last_id = max(self._last_id, row.id)
+        # expired tokens are rejected by their exp claim already
+        expired = [jti for jti, expires_at in self._revoked.items() if expires_at <= time.time()]
+        for jti in expired:
+            del self._revoked[jti]
+
+    def clear(self) -> None:
+        self._revoked.clear()
+        self._last_id = 0
+        self._synced_at = None
+
+
+revocation_list = RevocationList(settings.REVOCATION_SYNC_SECONDS)
+
+
+async def revoke(db: AsyncSession, jti: str, exp: int) -> None:
+    """Revoke the JWT `jti` (expiring at the unix time `exp`) in the caller's transaction."""
+    statement = upsert_insert(db, RevokedTokenModel.__table__).values(
+        jti=jti, expires_at=datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None))
+    await db.execute(statement.on_conflict_do_nothing(index_elements=[RevokedTokenModel.jti]))
+    revocation_list.add(jti, exp)
+
+
+def sweep_expired(db: Session, model, batch_size: int) -> int:
+    """Delete the rows of `model` past expires_at, `batch_size` per statement and transaction; returns the count."""
+    deleted = 0
+    while True:
+        expired = select(model.id).where(model.expires_at < utcnow()).limit(batch_size)
+        result = db.execute(delete(model).where(model.id.in_(expired.scalar_subquery())))
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+def sweep_tokens(db: Session, batch_size: int) -> Dict[str, int]:
+    return {"tokens": sweep_expired(db, TokenModel, batch_size),
+            "revoked_tokens": sweep_expired(db, RevokedTokenModel, batch_size)}
@@ -0,0 +1,249 @@
+"""In-process load test of the API.
+
+Seeds USERS x TASKS into a scratch database, then drives login, list, detail,
+create, update and delete traffic through httpx (in-process over ASGITransport,
+or against a running server with --url) and prints per endpoint latency
+percentiles, throughput and database queries per request as JSON.
+
+    cd app && PYTHONPATH=.. python -m app.benchmarks.load --users 50 --tasks-per-user 100 --requests 500
+    cd app && PYTHONPATH=.. python -m app.benchmarks.load --output before.json
+    cd app && PYTHONPATH=.. python -m app.benchmarks.load --compare before.json
+
+Query counts are only available in-process.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import tempfile
+import time
+
+
+PASSWORD = "benchmark-password"
+
+
+def percentile(sorted_values, percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank method
+    index = min(len(sorted_values) - 1, max(0, math.ceil(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def seed(engine, users: int, tasks_per_user: int):
+    """Creates the schema and bulk seeds it through app.datagen; returns the user ids."""
+    from sqlalchemy import select
+    from app.core.database import Base
+    from app.datagen import bulk_seed
+    from app.users.models import UserModel
+
+    Base.metadata.create_all(bind=engine)
+    bulk_seed(engine.url.render_as_string(hide_password=False), users, tasks_per_user,
+              password=PASSWORD, username_prefix="bench_user", report=lambda message: None)
+    with engine.connect() as connection:
+        return connection.execute(select(UserModel.id).where(UserModel.username.like("bench_user_%"))).scalars().all()
+
+
+class Scenario:
+    def __init__(self, name: str, make_request):
+        self.name = name
+        self.make_request = make_request
+        self.latencies = []
+        self.errors = 0
+        self.queries = 0
+        self.elapsed = 0.0
+
+    def report(self) -> dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "rps": round(count / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "queries_per_request": round(self.queries / count, 2) if count and self.queries is not None else None,
+        }
+
+
+async def run_scenario(scenario: Scenario, client, requests: int, concurrency: int, query_counter):
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await scenario.make_request(client)
+            scenario.latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                scenario.errors += 1
+
+    queries_before = query_counter[0] if query_counter else None
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    scenario.elapsed = time.perf_counter() - started
+    scenario.queries = query_counter[0] - queries_before if query_counter else None
+
+
+def build_scenarios(user_ids, tokens, task_ids):
+    def auth(user_id):
+        return {"Authorization": f"Bearer {tokens[user_id]}"}
+
+    def random_owned_task():
+        user_id = random.choice(user_ids)
+        return user_id, random.choice(task_ids[user_id])
+
+    created = []
+
+    async def login(client):
+        return await client.post("/users/login", json={"username": f"bench_user_{random.randrange(len(user_ids))}",
+                                                       "password": PASSWORD})
+
+    async def list_tasks(client):
+        user_id = random.choice(user_ids)
+        return await client.get("/todos/tasks", params={"limit": 50}, headers=auth(user_id))
+
+    async def detail(client):
+        user_id, task_id = random_owned_task()
+        return await client.get(f"/todos/tasks/{task_id}", headers=auth(user_id))
+
+    async def create(client):
+        user_id = random.choice(user_ids)
+        response = await client.post("/todos/tasks", headers=auth(user_id),
+                                     json={"title": "created by the benchmark", "is_completed": False})
+        if response.status_code == 200:
+            created.append((user_id, response.json()["id"]))
+        return response
+
+    async def update(client):
+        user_id, task_id = random_owned_task()
+        return await client.put(f"/todos/tasks/{task_id}", headers=auth(user_id),
+                                json={"title": "updated by the benchmark", "is_completed": True})
+
+    async def delete(client):
+        if created:
+            user_id, task_id = created.pop()
+        else:
+            user_id, task_id = random_owned_task()
+        return await client.delete(f"/todos/tasks/{task_id}", headers=auth(user_id))
+
+    return [Scenario("login", login), Scenario("list", list_tasks), Scenario("detail", detail),
+            Scenario("create", create), Scenario("update", update), Scenario("delete", delete)]
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlalchemy import create_engine, event, select
+    from app.auth.jwt_auth import generate_access_token
+    from app.tasks.models import TaskModel
+
+    engine = create_engine(os.environ["SQLALCHEMY_DATABASE_URL"])
+    started = time.perf_counter()
+    user_ids = seed(engine, args.users, args.tasks_per_user)
+    seed_seconds = time.perf_counter() - started
+    with engine.connect() as connection:
+        task_ids = {}
+        for user_id, task_id in connection.execute(select(TaskModel.user_id, TaskModel.id)):
+            task_ids.setdefault(user_id, []).append(task_id)
+    engine.dispose()
+    tokens = {user_id: generate_access_token(user_id, expires_in=3600) for user_id in user_ids}
+
+    query_counter = None
+    async_engine = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+    else:
+        from main import app
+        from app.core.database import async_engine
+
+        query_counter = [0]
+
+        @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+        def count(*_):
+            query_counter[0] += 1
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+
+    scenarios = build_scenarios(user_ids, tokens, task_ids)
+    async with client:
+        for scenario in scenarios:
+            requests = max(1, args.requests // 10) if scenario.name == "login" else args.requests
+            await run_scenario(scenario, client, requests, args.concurrency, query_counter)
+    if async_engine is not None:
+        # ASGITransport does not run the lifespan, release what it would have
+        from app.auth.hashing import password_hasher
+        password_hasher.shutdown()
+        await async_engine.dispose()
+
+    return {
+        "revision": git_revision(),
+        "target": args.url or "in-process",
+        "users": args.users,
+        "tasks_per_user": args.tasks_per_user,
+        "concurrency": args.concurrency,
+        "seed_seconds": round(seed_seconds, 2),
+        "endpoints": {scenario.name: scenario.report() for scenario in scenarios},
+    }
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Relative change of every numeric endpoint metric against a previous report."""
+    deltas = {}
+    for name, metrics in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name, {})
+        deltas[name] = {key: round((value - previous[key]) / previous[key] * 100, 1)
+                        for key, value in metrics.items()
+                        if isinstance(value, (int, float)) and previous.get(key)}
+    return {"baseline_revision": baseline.get("revision"), "change_percent": deltas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks-per-user", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint (login runs a tenth)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--database-url", help="database to seed, defaults to a scratch sqlite file")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="previous JSON report to compare against")
+    args = parser.parse_args()
+
+    scratch = None
+    if args.database_url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        args.database_url = f"sqlite:///{scratch.name}"
+    # must happen before app.core.config builds the settings
+    os.environ["SQLALCHEMY_DATABASE_URL"] = args.database_url
+    os.environ.pop("SQLALCHEMY_ASYNC_DATABASE_URL", None)
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Micro-benchmark of the task list serialization paths on 50-item pages.
+
+    cd app && PYTHONPATH=.. python -m app.benchmarks.serialization --pages 2000
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from app.tasks.models import TaskModel
+from app.users.models import UserModel  # noqa: F401 - registers the TaskModel.user relationship target
+from app.tasks.schemas import TaskListAdapter, TASK_RESPONSE_FIELDS, task_rows_to_json
+
+
+def build_page(size: int = 50):
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    rows = [
+        (f"task title number {i}", "some longer description " * 8, i % 2 == 0,
+         i + 1, now + timedelta(seconds=i), now + timedelta(seconds=i, microseconds=250))
+        for i in range(size)
+    ]
+    objects = [TaskModel(**dict(zip(TASK_RESPONSE_FIELDS, row))) for row in rows]
+    return rows, objects
+
+
+def response_model_path(objects) -> bytes:
+    # what FastAPI does for response_model=List[TaskResponseSchema] + JSONResponse
+    validated = TaskListAdapter.validate_python(objects, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def pydantic_dump_path(objects) -> bytes:
+    return TaskListAdapter.dump_json(TaskListAdapter.validate_python(objects, from_attributes=True))
+
+
+def row_tuple_path(rows) -> bytes:
+    return task_rows_to_json(rows)
+
+
+def run(pages: int = 2000, size: int = 50) -> dict:
+    rows, objects = build_page(size)
+    assert pydantic_dump_path(objects) == row_tuple_path(rows)
+    paths = {
+        "response_model": lambda: response_model_path(objects),
+        "pydantic_dump_json": lambda: pydantic_dump_path(objects),
+        "row_tuples": lambda: row_tuple_path(rows),
+    }
+    report = {}
+    for name, func in paths.items():
+        seconds = min(timeit.repeat(func, number=pages, repeat=3))
+        report[name] = {"us_per_page": round(seconds / pages * 1e6, 2)}
+    baseline = report["response_model"]["us_per_page"]
+    for result in report.values():
+        result["speedup"] = round(baseline / result["us_per_page"], 2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.pages, args.size), indent=2))
@@ -1,11 +1,82 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, Literal, Optional
 
 
 class Settings(BaseSettings):
     SQLALCHEMY_DATABASE_URL : str
+    # defaults to SQLALCHEMY_DATABASE_URL with its async driver (asyncpg/aiosqlite)
+    SQLALCHEMY_ASYNC_DATABASE_URL : Optional[str] = None
+    # optional read replica (sync style url, the async driver is derived) used by GET task endpoints
+    SQLALCHEMY_REPLICA_DATABASE_URL : Optional[str] = None
+    # after a write, the user's reads stay on the primary for this many seconds
+    READ_YOUR_WRITES_SECONDS : int = 5
     JWT_SECRET_KEY : str = "test"
+    # lifetime of opaque bearer tokens (tokens table)
+    TOKEN_EXPIRE_SECONDS : int = 30 * 24 * 3600
+    # seconds between two loads of new JWT revocations into a worker's in-memory list
+    REVOCATION_SYNC_SECONDS : float = 5
+    # rows deleted per statement by the sweep_tokens job
+    TOKEN_SWEEP_BATCH : int = 1000
+    # connection pool of each engine (per worker process), ignored for in-memory sqlite
+    DB_POOL_SIZE : int = 5
+    DB_MAX_OVERFLOW : int = 10
+    DB_POOL_TIMEOUT : float = 30
+    DB_POOL_RECYCLE : int = 1800
+    DB_POOL_PRE_PING : bool = True
+    DB_CONNECT_TIMEOUT : int = 10
+    # bcrypt thread pool size and how many hash/verify calls may wait on it before 503
+    PASSWORD_HASH_WORKERS : int = 4
+    PASSWORD_HASH_MAX_PENDING : int = 64
+    # authenticated principal cache (entries, seconds), 0 entries disables it
+    PRINCIPAL_CACHE_SIZE : int = 10000
+    PRINCIPAL_CACHE_TTL : float = 60
+    # upper bound of items accepted by the /todos/tasks:batch endpoints
+    TASK_BATCH_MAX_ITEMS : int = 500
+    # seconds a cached task list/detail response is served before it is rebuilt
+    TASK_CACHE_EXPIRE : int = 30
+    # serve hand built JSON responses with orjson instead of the stdlib encoder
+    FAST_JSON_RESPONSE : bool = False
+    # warn when one request runs the same statement shape more than this many times, 0 disables
+    N_PLUS_ONE_THRESHOLD : int = 0
+    # token bucket per user (valid bearer token) or client ip, "<requests>/<second|minute|hour>"
+    RATE_LIMIT_ENABLED : bool = True
+    RATE_LIMIT_DEFAULT : str = "300/minute"
+    # budgets of single routes ("<METHOD> <path template>"), replacing the default one
+    RATE_LIMIT_ROUTES : Dict[str, str] = {
+        "POST /users/login": "10/minute",
+        "POST /users/register": "5/minute",
+        "POST /users/refresh-token": "30/minute",
+    }
+    # memory keeps the buckets per worker, cache keeps them in the FastAPICache backend (shared if that is)
+    RATE_LIMIT_STORE : Literal["memory", "cache"] = "memory"
+    # per worker, requests beyond this many in flight are answered 503 right away, 0 disables
+    MAX_IN_FLIGHT_REQUESTS : int = 256
+    # background jobs (python -m app.jobs.worker): worker processes, seconds between polls of an idle worker
+    JOB_WORKER_PROCESSES : int = 2
+    JOB_POLL_INTERVAL : float = 1.0
+    # attempts per job, a failed attempt is retried after JOB_RETRY_BACKOFF * 2 ** (attempt - 1) seconds
+    JOB_MAX_ATTEMPTS : int = 3
+    JOB_RETRY_BACKOFF : float = 5
+    # a running job whose worker has not finished it for this long is handed to another worker
+    JOB_LOCK_TIMEOUT : int = 3600
+    # finished jobs are deleted after this many days by the periodic purge_jobs job
+    JOB_RETENTION_DAYS : int = 7
+    # shared outbound http client (per worker): seconds to connect / for the whole request, pool limits
+    HTTP_CONNECT_TIMEOUT : float = 2
+    HTTP_TIMEOUT : float = 5
+    HTTP_MAX_CONNECTIONS : int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS : int = 20
+    # upstream errors in a row that open a circuit breaker, seconds it stays open before a trial call
+    CIRCUIT_BREAKER_FAILURES : int = 5
+    CIRCUIT_BREAKER_RESET_SECONDS : float = 30
+    WEATHER_API_URL : str = "https://api.open-meteo.com/v1/forecast"
+    # weather is served fresh for FRESH seconds, then stale (refreshed in the background) until STALE seconds
+    WEATHER_FRESH_SECONDS : int = 60
+    WEATHER_STALE_SECONDS : int = 900
+    # coordinates are rounded to this many decimals (2 is about 1 km) before the cache lookup
+    WEATHER_COORDINATE_DECIMALS : int = 2
 
     model_config = SettingsConfigDict(env_file=".env")
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,17 +1,99 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from app.core.config import settings
+from app.core.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+
+
+# async drivers used for each sync dialect of SQLALCHEMY_DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name())
+    if drivername is None:
+        raise ValueError(f"no async driver configured for '{url.get_backend_name()}'")
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# INSERT constructs with on_conflict_do_update/on_conflict_do_nothing, by dialect name
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert_insert(db, table):
+    """INSERT with ON CONFLICT support for the dialect `db` (a sync or async session) is bound to."""
+    return UPSERT_DIALECTS[db.get_bind().dialect.name](table)
+
+
+def is_memory_database(url) -> bool:
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory")
+
+
+def get_connect_args(url) -> dict:
+    backend, driver = url.get_backend_name(), url.get_driver_name()
+    if backend == "sqlite":
+        # aiosqlite runs each connection on its own thread already
+        return {} if driver == "aiosqlite" else {"check_same_thread": False}
+    if driver == "asyncpg":
+        return {"timeout": settings.DB_CONNECT_TIMEOUT}
+    if backend == "postgresql":
+        return {"connect_timeout": settings.DB_CONNECT_TIMEOUT}
+    return {}
+
+
+def get_engine_options(database_url: str) -> dict:
+    url = make_url(database_url)
+    options = {"connect_args": get_connect_args(url)}
+    if not is_memory_database(url):
+        is_async = url.get_driver_name() in ("aiosqlite", "asyncpg")
+        options.update(
+            poolclass=InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    return options
 
 
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URL,
-                       connect_args={'check_same_thread': False},
-                       )
+                       **get_engine_options(settings.SQLALCHEMY_DATABASE_URL))
+
+ASYNC_DATABASE_URL = settings.SQLALCHEMY_ASYNC_DATABASE_URL or get_async_database_url(settings.SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **get_engine_options(ASYNC_DATABASE_URL))
+
+replica_async_engine = None
+if settings.SQLALCHEMY_REPLICA_DATABASE_URL:
+    REPLICA_ASYNC_DATABASE_URL = get_async_database_url(settings.SQLALCHEMY_REPLICA_DATABASE_URL)
+    replica_options = get_engine_options(REPLICA_ASYNC_DATABASE_URL)
+    if make_url(REPLICA_ASYNC_DATABASE_URL).get_backend_name() == "postgresql":
+        replica_options["execution_options"] = {"postgresql_readonly": True}
+    replica_async_engine = create_async_engine(REPLICA_ASYNC_DATABASE_URL, **replica_options)
 
 
 SessionLocal = sessionmaker(autocommit=False,
                             autoflush=False,
                             bind=engine)
 
+# expire_on_commit is disabled so returned objects stay readable after commit
+# without an implicit (and in async mode forbidden) lazy refresh
+AsyncSessionLocal = async_sessionmaker(autoflush=False,
+                                       expire_on_commit=False,
+                                       bind=async_engine)
+
+# falls back to the primary when no replica is configured
+AsyncReplicaSessionLocal = async_sessionmaker(autoflush=False,
+                                              expire_on_commit=False,
+                                              bind=replica_async_engine or async_engine)
+
 
 # create base class for declaring tables
 Base = declarative_base()
@@ -22,4 +104,14 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_replica_db():
+    async with AsyncReplicaSessionLocal() as db:
+        yield db
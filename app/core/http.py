@@ -0,0 +1,80 @@
+"""Shared outbound HTTP client and the resilience helpers used around it."""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict
+import httpx
+from fastapi import Request
+from app.core.config import settings
+
+
+def create_http_client(**options) -> httpx.AsyncClient:
+    """One pooled keep-alive client per worker, created in the lifespan of the app."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=settings.HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS),
+        **options,
+    )
+
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http_client
+
+
+class SingleFlight:
+    """Concurrent calls for one key share a single execution of the first caller's function."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable]):
+        future = self._calls.get(key)
+        if future is None:
+            future = self._calls[key] = asyncio.ensure_future(func())
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        # shielded: one caller going away (client disconnect) must not cancel the call for the others
+        return await asyncio.shield(future)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._calls
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive failures; after `reset_seconds` one trial call decides whether it closes."""
+
+    def __init__(self, failures: int, reset_seconds: float):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    async def call(self, func: Callable[[], Awaitable]):
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial_running):
+            raise CircuitOpenError("circuit open")
+        self._trial_running = state == "half-open"
+        try:
+            result = await func()
+        except Exception:
+            self.consecutive_failures += 1
+            if state == "half-open" or self.consecutive_failures >= self.failures:
+                self.opened_at = time.monotonic()
+            raise
+        finally:
+            self._trial_running = False
+        self.consecutive_failures = 0
+        self.opened_at = None
+        return result
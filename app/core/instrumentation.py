@@ -0,0 +1,110 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+
+logger = logging.getLogger("app.requests")
+
+# collapses expanded IN lists / VALUES rows so statements differing only in their
+# number of bound parameters share one shape
+PARAMETER_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s|:\w+))*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return PARAMETER_LIST.sub("(?)", WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestMetrics:
+    """SQL and timing figures collected while serving one request."""
+
+    def __init__(self, n_plus_one_threshold: int = 0):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.query_count = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+        self.shapes = Counter()
+        self.timings = Counter()
+        self.warned_shapes = set()
+
+    def record_query(self, statement: str, seconds: float) -> None:
+        self.query_count += 1
+        self.db_seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+        if self.n_plus_one_threshold > 0:
+            shape = statement_shape(statement)
+            self.shapes[shape] += 1
+            if self.shapes[shape] > self.n_plus_one_threshold and shape not in self.warned_shapes:
+                self.warned_shapes.add(shape)
+                logger.warning("possible N+1 query: statement ran more than %d times in one request: %s",
+                               self.n_plus_one_threshold, shape)
+
+    def record_timing(self, name: str, seconds: float) -> None:
+        self.timings[name] += seconds
+
+    def server_timing(self, total_seconds: float) -> str:
+        metrics = [f'db;dur={self.db_seconds * 1000:.3f};desc="{self.query_count} queries"',
+                   f"db-slowest;dur={self.slowest_seconds * 1000:.3f}"]
+        metrics += [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.timings.items()]
+        metrics.append(f"total;dur={total_seconds * 1000:.3f}")
+        return ", ".join(metrics)
+
+    def log_fields(self) -> dict:
+        return {
+            "db_queries": self.query_count,
+            "db_ms": round(self.db_seconds * 1000, 3),
+            "db_slowest_ms": round(self.slowest_seconds * 1000, 3),
+            "db_slowest_statement": self.slowest_statement[:200] if self.slowest_statement else None,
+            **{f"{name}_ms": round(seconds * 1000, 3) for name, seconds in self.timings.items()},
+        }
+
+
+current_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("current_metrics", default=None)
+
+
+@contextmanager
+def request_instrumentation():
+    metrics = RequestMetrics(n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD)
+    token = current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        current_metrics.reset(token)
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """Adds a named duration (e.g. password hashing) to the current request, if any."""
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics.record_timing(name, seconds)
+
+
+def log_request(method: str, path: str, status_code: int, seconds: float, metrics: RequestMetrics) -> None:
+    logger.info(json.dumps({"method": method, "path": path, "status": status_code,
+                            "duration_ms": round(seconds * 1000, 3), **metrics.log_fields()}))
+
+
+# listeners on the Engine class cover every engine (primary, replica, sync and async)
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_metrics.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = current_metrics.get()
+    started = conn.info.get("query_started")
+    if metrics is not None and started:
+        metrics.record_query(statement, time.perf_counter() - started.pop())
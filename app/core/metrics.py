@@ -0,0 +1,108 @@
+"""Prometheus metrics.
+
+With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty directory
+shared by the workers (before they start): every worker then writes its samples
+to mmap files there and /metrics merges them, whichever worker serves it.
+"""
+import os
+import time
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by templated route",
+                   ["method", "route", "status"])
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by templated route",
+                            ["method", "route"],
+                            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served", ["method"],
+                    multiprocess_mode="livesum")
+RATE_LIMITED = Counter("rate_limited_total", "Requests rejected with 429 by rate limit rule", ["rule"])
+LOAD_SHED = Counter("load_shed_total", "Requests rejected with 503 because too many were in flight")
+AUTH_FAILURES = Counter("auth_failures_total", "Rejected bearer authentications by reason", ["reason"])
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size", ["engine"], multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections checked out", ["engine"],
+                            multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Overflow connections open", ["engine"],
+                         multiprocess_mode="livesum")
+DB_POOL_CHECKOUT_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Pool checkouts that timed out", ["engine"])
+DB_POOL_CHECKOUT_SECONDS = Histogram("db_pool_checkout_seconds", "Time to check a connection out of the pool",
+                                     ["engine"], buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30))
+
+
+def instrument_engine_pool(name: str, engine) -> None:
+    """Keeps the pool gauges of `engine` current; listeners and stats survive engine.dispose()."""
+    pool = engine.pool
+
+    def update(*args):
+        current = engine.pool
+        DB_POOL_SIZE.labels(name).set(current.size())
+        DB_POOL_CHECKED_OUT.labels(name).set(current.checkedout())
+        DB_POOL_OVERFLOW.labels(name).set(max(current.overflow(), 0))
+
+    if not hasattr(pool, "overflow"):
+        # StaticPool / SingletonThreadPool (in-memory sqlite) have nothing to report
+        return
+    event.listen(pool, "checkout", update)
+    event.listen(pool, "checkin", update)
+    update()
+
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        def observe(wait_seconds: float, timed_out: bool):
+            DB_POOL_CHECKOUT_SECONDS.labels(name).observe(wait_seconds)
+            if timed_out:
+                DB_POOL_CHECKOUT_TIMEOUTS.labels(name).inc()
+        stats.observers.append(observe)
+
+
+class PrometheusMiddleware:
+    """Plain ASGI middleware: a few counter/histogram updates per request, no locks held across awaits."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status_code = 500
+        in_progress = IN_PROGRESS.labels(method)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # the router stores the matched route in the shared scope, unmatched paths are
+            # grouped so arbitrary URLs cannot blow up the label cardinality
+            route = scope.get("route")
+            path = getattr(route, "path", "<unmatched>")
+            REQUEST_LATENCY.labels(method, path).observe(time.perf_counter() - started)
+            REQUESTS.labels(method, path, str(status_code)).inc()
+
+
+def render_metrics():
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead() -> None:
+    # drops this worker's live gauges from the merged view
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,201 @@
+"""Token bucket rate limiting and concurrency based load shedding (pure ASGI middlewares)."""
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import jwt
+from fastapi import status
+from fastapi.responses import JSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.types import Backend
+from starlette.routing import Match
+from app.core.config import settings
+from app.core.metrics import LOAD_SHED, RATE_LIMITED
+
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    capacity: float
+    refill_per_second: float
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """"10/minute" -> bursts of up to 10 requests, refilled at 10 per minute."""
+        count, _, period = value.partition("/")
+        return cls(capacity=float(count), refill_per_second=float(count) / PERIODS[period.strip()])
+
+    def take(self, tokens: float, updated: float, now: float) -> Tuple[float, float]:
+        """One request against a bucket holding `tokens` at `updated`; returns (tokens left, seconds to wait)."""
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+        if tokens >= 1:
+            return tokens - 1, 0.0
+        return tokens, (1 - tokens) / self.refill_per_second
+
+    @property
+    def ttl(self) -> int:
+        # an untouched bucket is full again after this long, so it can be forgotten
+        return math.ceil(self.capacity / self.refill_per_second) + 1
+
+
+class MemoryBucketStore:
+    """Buckets of this worker process, least recently used ones are dropped beyond `maxsize`."""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        # no await between read and write, so this is atomic on the event loop
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (limit.capacity, now))
+        tokens, wait = limit.take(tokens, updated, now)
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class BackendBucketStore:
+    """Buckets in a cache backend (defaults to the FastAPICache one), shared by workers when the backend is.
+
+    Read and write are two backend calls, so concurrent requests of one key on
+    different workers can both pass; the limit may overshoot by about the number
+    of workers, never undershoot.
+    """
+
+    def __init__(self, backend: Optional[Backend] = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> Backend:
+        return self._backend or FastAPICache.get_backend()
+
+    @backend.setter
+    def backend(self, backend: Optional[Backend]) -> None:
+        self._backend = backend
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        now = time.time()
+        state = await self.backend.get(key)
+        tokens, updated = map(float, state.split(b":")) if state else (limit.capacity, now)
+        tokens, wait = limit.take(tokens, updated, now)
+        await self.backend.set(key, f"{tokens:.6f}:{now:.6f}".encode(), limit.ttl)
+        return wait
+
+
+class RateLimiter:
+    def __init__(self, default: str, routes: Dict[str, str], store=None, enabled: bool = True):
+        self.enabled = enabled
+        self.default = RateLimit.parse(default)
+        self.routes = routes
+        self.store = store or MemoryBucketStore()
+
+    @property
+    def routes(self) -> Dict[str, RateLimit]:
+        return self._routes
+
+    @routes.setter
+    def routes(self, routes: Dict[str, str]) -> None:
+        self._routes = {spec: RateLimit.parse(value) for spec, value in routes.items()}
+        self._route_rules = None
+
+    def resolve_routes(self, router) -> list:
+        """(route, method, spec, limit) of every configured budget, looked up once in the app's routes."""
+        if self._route_rules is None:
+            rules = []
+            for spec, limit in self.routes.items():
+                method, _, path = spec.partition(" ")
+                for route in router.routes:
+                    if getattr(route, "path", None) == path:
+                        rules.append((route, method.upper(), spec, limit))
+            self._route_rules = rules
+        return self._route_rules
+
+    def rule_for(self, scope) -> Tuple[str, RateLimit]:
+        for route, method, spec, limit in self.resolve_routes(scope["app"].router):
+            if scope["method"] == method and route.matches(scope)[0] == Match.FULL:
+                return spec, limit
+        return "default", self.default
+
+    @staticmethod
+    def identity(scope) -> str:
+        """user:<id> for a valid bearer token, else ip:<client address>."""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        # verified, otherwise anyone could spend somebody else's budget
+                        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+                        if payload.get("id") is not None:
+                            return f"user:{payload['id']}"
+                    except jwt.PyJWTError:
+                        pass
+                break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def check(self, scope) -> Tuple[str, float]:
+        """Spend one token for the request; returns (rule, seconds until allowed, 0 when allowed)."""
+        rule, limit = self.rule_for(scope)
+        return rule, await self.store.take(f"ratelimit:{rule}:{self.identity(scope)}", limit)
+
+
+def error_response(status_code: int, detail: str, retry_after: int) -> JSONResponse:
+    # same body as the app's HTTPException handler, which does not run for middleware responses
+    return JSONResponse(status_code=status_code,
+                        content={"error": True, "status_code": status_code, "detail": detail},
+                        headers={"Retry-After": str(retry_after)})
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: RateLimiter, exempt_paths=("/metrics",)):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled or scope["path"] in self.exempt_paths:
+            return await self.app(scope, receive, send)
+        rule, wait = await self.limiter.check(scope)
+        if wait:
+            RATE_LIMITED.labels(rule).inc()
+            response = error_response(status.HTTP_429_TOO_MANY_REQUESTS, "Too many requests.",
+                                      max(1, math.ceil(wait)))
+            return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+
+class LoadSheddingMiddleware:
+    """Rejects requests beyond `max_in_flight` concurrent ones with an immediate 503 instead of queueing them."""
+
+    def __init__(self, app, max_in_flight: int, exempt_paths=("/metrics",)):
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.exempt_paths = exempt_paths
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.max_in_flight or scope["path"] in self.exempt_paths:
+            return await self.app(scope, receive, send)
+        if self.in_flight >= self.max_in_flight:
+            LOAD_SHED.inc()
+            response = error_response(status.HTTP_503_SERVICE_UNAVAILABLE, "Server is overloaded, retry later.", 1)
+            return await response(scope, receive, send)
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+
+rate_limiter = RateLimiter(settings.RATE_LIMIT_DEFAULT, settings.RATE_LIMIT_ROUTES,
+                           store=BackendBucketStore() if settings.RATE_LIMIT_STORE == "cache" else MemoryBucketStore(),
+                           enabled=settings.RATE_LIMIT_ENABLED)
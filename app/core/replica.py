@@ -0,0 +1,53 @@
+from typing import Optional
+from fastapi import Depends
+from fastapi_cache import FastAPICache
+from fastapi_cache.types import Backend
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth.jwt_auth import get_authenticated_user
+from app.auth.principal import Principal
+from app.core.config import settings
+from app.core.database import get_async_db, get_async_replica_db
+
+
+class ReadYourWrites:
+    """Remembers which users wrote recently so their reads can skip the (lagging) replica.
+
+    The marker lives in the cache backend with the window as its TTL, so with a
+    shared backend it holds across worker processes.
+    """
+
+    def __init__(self, window: int, backend: Optional[Backend] = None):
+        self.window = window
+        self._backend = backend
+
+    @property
+    def backend(self) -> Backend:
+        return self._backend or FastAPICache.get_backend()
+
+    @backend.setter
+    def backend(self, backend: Optional[Backend]) -> None:
+        self._backend = backend
+
+    def _key(self, user_id: int) -> str:
+        return f"read-your-writes:{user_id}"
+
+    async def mark(self, user_id: int) -> None:
+        await self.backend.set(self._key(user_id), b"1", self.window)
+
+    async def is_recent(self, user_id: int) -> bool:
+        return await self.backend.get(self._key(user_id)) is not None
+
+
+read_your_writes = ReadYourWrites(window=settings.READ_YOUR_WRITES_SECONDS)
+
+
+async def get_async_read_db(user: Principal = Depends(get_authenticated_user),
+                            primary: AsyncSession = Depends(get_async_db),
+                            replica: AsyncSession = Depends(get_async_replica_db)) -> AsyncSession:
+    """Session for read-only handlers: the replica, unless the user wrote within the window.
+
+    Both sessions are lazy, the one not returned never checks out a connection.
+    """
+    if await read_your_writes.is_recent(user.id):
+        return primary
+    return replica
@@ -0,0 +1,21 @@
+import json
+from datetime import datetime
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+def dump_json(content) -> bytes:
+    """Compact JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=datetime.isoformat, separators=(",", ":"),
+                      ensure_ascii=False).encode()
+
+
+# opt-in (FAST_JSON_RESPONSE) orjson backed response class for hand built responses
+AppJSONResponse = ORJSONResponse if settings.FAST_JSON_RESPONSE and orjson is not None else JSONResponse
@@ -1,7 +1,16 @@
+import argparse
+import csv
+import io
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import create_engine, insert
+from app.core.config import settings
 from app.core.database import SessionLocal
 from sqlalchemy.orm import Session
-from app.users.models import UserModel
-from app.tasks.models import TaskModel
+from app.users.models import UserModel, pwd_context
+from app.tasks.models import TaskModel, UserTaskStatsModel
+from app.tasks.stats import rebuild_task_stats
 from faker import Faker
 
 
@@ -31,16 +40,153 @@ def seed_tasks(db: SessionLocal, user: UserModel, count=10):
         )
     db.add_all(task_list)
     db.commit()
+    rebuild_task_stats(db, [user.id])
     print(f"added {count} Task For User with User_id: {user.id}")
 
 
-def main():
-    db = SessionLocal()
+# ---------------------------------------------------------------------------
+# bulk seeding
+#
+#   cd app && PYTHONPATH=.. python -m app.datagen --users 100000 --tasks-per-user 100 --workers 4
+#
+# Faker text is generated once into pools and sampled, every user shares one
+# precomputed bcrypt hash, users are inserted with multi-row INSERT ... RETURNING
+# and tasks with chunked executemany inserts (or COPY on postgres/psycopg2).
+# ---------------------------------------------------------------------------
+
+TEXT_POOL_SIZE = 2000
+
+_engines = {}
+_text_pools = None
+
+
+def get_engine(database_url: str):
+    # one engine per worker process
+    if database_url not in _engines:
+        _engines[database_url] = create_engine(database_url)
+    return _engines[database_url]
+
+
+def get_text_pools():
+    global _text_pools
+    if _text_pools is None:
+        _text_pools = ([fake.sentence(nb_words=6)[:150] for _ in range(TEXT_POOL_SIZE)],
+                       [fake.text(max_nb_chars=500) for _ in range(TEXT_POOL_SIZE)])
+    return _text_pools
+
+
+def copy_tasks(connection, rows) -> None:
+    """Stream task rows through postgres COPY (psycopg2 only)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow((row["user_id"], row["title"], row["description"], "t" if row["is_completed"] else "f"))
+    buffer.seek(0)
+    cursor = connection.connection.dbapi_connection.cursor()
     try:
-        user = seed_users(db)
-        seed_tasks(db, user)
+        cursor.copy_expert("COPY tasks (user_id, title, description, is_completed) FROM STDIN WITH (FORMAT csv)", buffer)
     finally:
-        db.close()
+        cursor.close()
+
+
+def supports_copy(connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return hasattr(connection.connection.dbapi_connection.cursor(), "copy_expert")
+
+
+def seed_chunk(database_url: str, username_prefix: str, start: int, count: int, tasks_per_user: int,
+               password_hash: str, chunk_size: int, use_copy: bool):
+    """Seed users [start, start + count) and their tasks in one transaction; returns (users, tasks)."""
+    titles, descriptions = get_text_pools()
+    users_table, tasks_table = UserModel.__table__, TaskModel.__table__
+    tasks_inserted = 0
+    with get_engine(database_url).begin() as connection:
+        copy = use_copy and supports_copy(connection)
+        user_rows = [{"username": f"{username_prefix}_{i}", "password": password_hash, "is_active": True}
+                     for i in range(start, start + count)]
+        user_ids = []
+        for offset in range(0, len(user_rows), chunk_size):
+            result = connection.execute(insert(users_table).returning(users_table.c.id, sort_by_parameter_order=True),
+                                        user_rows[offset:offset + chunk_size])
+            user_ids.extend(result.scalars().all())
+
+        rows, stats_rows = [], []
+        for user_id in user_ids:
+            completed = 0
+            for _ in range(tasks_per_user):
+                is_completed = random.random() < 0.5
+                completed += is_completed
+                rows.append({"user_id": user_id,
+                             "title": random.choice(titles),
+                             "description": random.choice(descriptions),
+                             "is_completed": is_completed})
+                if len(rows) >= chunk_size:
+                    copy_tasks(connection, rows) if copy else connection.execute(insert(tasks_table), rows)
+                    tasks_inserted += len(rows)
+                    rows = []
+            # the users are new, so their counters are known without counting
+            stats_rows.append({"user_id": user_id, "total": tasks_per_user, "completed": completed})
+        if rows:
+            copy_tasks(connection, rows) if copy else connection.execute(insert(tasks_table), rows)
+            tasks_inserted += len(rows)
+        for offset in range(0, len(stats_rows), chunk_size):
+            connection.execute(insert(UserTaskStatsModel.__table__), stats_rows[offset:offset + chunk_size])
+    return len(user_ids), tasks_inserted
+
+
+def bulk_seed(database_url: str, users: int, tasks_per_user: int, password: str = "123456789",
+              username_prefix: str = "seed_user", workers: int = 1, users_per_chunk: int = 1000,
+              chunk_size: int = 5000, use_copy: bool = True, report=print) -> dict:
+    password_hash = pwd_context.hash(password)
+    jobs = [(database_url, username_prefix, start, min(users_per_chunk, users - start), tasks_per_user,
+             password_hash, chunk_size, use_copy)
+            for start in range(0, users, users_per_chunk)]
+
+    started = time.perf_counter()
+    users_done = tasks_done = 0
+
+    def progress(result):
+        nonlocal users_done, tasks_done
+        users_done += result[0]
+        tasks_done += result[1]
+        elapsed = time.perf_counter() - started
+        report(f"users {users_done}/{users}  tasks {tasks_done}/{users * tasks_per_user}  "
+               f"{tasks_done / elapsed:,.0f} tasks/s  {elapsed:.1f}s")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(seed_chunk, *zip(*jobs)):
+                progress(result)
+    else:
+        for job in jobs:
+            progress(seed_chunk(*job))
+
+    elapsed = time.perf_counter() - started
+    return {"users": users_done, "tasks": tasks_done, "seconds": round(elapsed, 2),
+            "tasks_per_second": round(tasks_done / elapsed) if elapsed else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="seed users and tasks")
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--tasks-per-user", type=int, default=10)
+    parser.add_argument("--password", default="123456789", help="password shared by every seeded user")
+    parser.add_argument("--username-prefix", default=f"seed_{int(time.time()):x}",
+                        help="usernames are <prefix>_<n>, use a new prefix for every run")
+    parser.add_argument("--workers", type=int, default=1, help="parallel worker processes (keep 1 on sqlite)")
+    parser.add_argument("--users-per-chunk", type=int, default=1000, help="users per worker job and transaction")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per INSERT/COPY batch")
+    parser.add_argument("--no-copy", action="store_true", help="use INSERT even when postgres COPY is available")
+    parser.add_argument("--database-url", default=settings.SQLALCHEMY_DATABASE_URL)
+    args = parser.parse_args()
+
+    summary = bulk_seed(args.database_url, args.users, args.tasks_per_user, password=args.password,
+                        username_prefix=args.username_prefix, workers=args.workers,
+                        users_per_chunk=args.users_per_chunk, chunk_size=args.chunk_size,
+                        use_copy=not args.no_copy)
+    print(f"seeded {summary['users']} users and {summary['tasks']} tasks in {summary['seconds']}s "
+          f"({summary['tasks_per_second']} tasks/s)")
 
 
 if __name__ == "__main__":
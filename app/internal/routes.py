@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from app.core.database import engine, async_engine, replica_async_engine
+from app.core.pool import pool_status
+from app.tasks.cache import task_cache
+
+
+# operational endpoints, kept out of the public OpenAPI schema
+router = APIRouter(tags=["internal"], prefix="/internal", include_in_schema=False)
+
+
+@router.get("/cache")
+async def cache_stats():
+    return {"tasks": task_cache.stats()}
+
+
+@router.get("/pool")
+async def pool_stats():
+    # numbers are per worker process
+    status = {"sync": pool_status(engine), "async": pool_status(async_engine.sync_engine)}
+    if replica_async_engine is not None:
+        status["replica"] = pool_status(replica_async_engine.sync_engine)
+    return status
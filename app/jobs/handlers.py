@@ -0,0 +1,35 @@
+import random
+import time
+from datetime import timedelta
+from app.core.config import settings
+from app.jobs.queue import purge_jobs
+from app.auth.tokens import sweep_tokens
+from app.jobs.registry import job
+
+
+@job("demo")
+def demo(context):
+    """The former /init-task background task: pretends to work for a few seconds."""
+    seconds = random.randint(3, 10)
+    context.progress(seconds=seconds)
+    time.sleep(seconds)
+    return {"slept": seconds}
+
+
+@job("log_time")
+def log_time(context):
+    message = f"task executed at {time.strftime('%Y-%m-%d %H:%M:%S')}"
+    print(message)
+    return {"message": message}
+
+
+@job("purge_jobs")
+def purge_finished_jobs(context):
+    with context.session_factory() as db:
+        return {"deleted": purge_jobs(db, timedelta(days=settings.JOB_RETENTION_DAYS))}
+
+
+@job("sweep_tokens")
+def sweep_expired_tokens(context):
+    with context.session_factory() as db:
+        return sweep_tokens(db, settings.TOKEN_SWEEP_BATCH)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index, JSON, func
+from app.core.database import Base
+
+
+class JobModel(Base):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # the claim query of the workers: next due job by status and run_at
+        Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    # owner allowed to poll it, null for system (e.g. periodic) jobs
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
+    # queued -> running -> succeeded | failed, a failed attempt with attempts left goes back to queued
+    status = Column(String(20), nullable=False, default='queued')
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    # times are naive UTC, set by the application
+    run_at = Column(DateTime, nullable=False)
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    # at most one job per key, used by the scheduler so a period is enqueued once
+    unique_key = Column(String(200), nullable=True, unique=True)
+    progress = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_date = Column(DateTime, nullable=False, server_default=func.now())
+    updated_date = Column(DateTime, nullable=False, server_default=func.now(), server_onupdate=func.now())
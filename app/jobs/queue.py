@@ -0,0 +1,111 @@
+"""Durable job queue on the `jobs` table.
+
+Web processes enqueue rows, worker processes (app.jobs.worker) claim them. On
+Postgres the claim is a ``SELECT ... FOR UPDATE SKIP LOCKED`` so concurrent
+workers never wait on, or take, each other's rows; SQLite has no row locks, there
+the conditional ``UPDATE ... WHERE status = <seen status>`` of the claim decides
+which worker wins.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import upsert_insert
+from app.jobs.models import JobModel
+
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def job_values(name: str, payload: Optional[Dict[str, Any]] = None, user_id: Optional[int] = None,
+               run_at: Optional[datetime] = None, max_attempts: Optional[int] = None,
+               unique_key: Optional[str] = None) -> dict:
+    now = utcnow()
+    return {"name": name, "payload": payload or {}, "user_id": user_id, "status": QUEUED, "attempts": 0,
+            "max_attempts": max_attempts or settings.JOB_MAX_ATTEMPTS, "run_at": run_at or now,
+            "unique_key": unique_key, "created_date": now, "updated_date": now}
+
+
+async def enqueue(db: AsyncSession, name: str, payload: Optional[Dict[str, Any]] = None, **options) -> JobModel:
+    """Add a job in the caller's transaction, it becomes visible to the workers on commit."""
+    return await db.scalar(insert(JobModel).values(**job_values(name, payload, **options)).returning(JobModel))
+
+
+def enqueue_once(db: Session, name: str, unique_key: str, payload: Optional[Dict[str, Any]] = None,
+                 **options) -> bool:
+    """Add a job unless one with `unique_key` exists; returns whether it was added. Commits."""
+    statement = (upsert_insert(db, JobModel.__table__)
+                 .values(**job_values(name, payload, unique_key=unique_key, **options))
+                 .on_conflict_do_nothing(index_elements=[JobModel.unique_key]))
+    added = db.execute(statement).rowcount == 1
+    db.commit()
+    return added
+
+
+def claim_job(db: Session, worker_id: str) -> Optional[JobModel]:
+    """Mark the next due job (or one abandoned by a dead worker) running for `worker_id`."""
+    now = utcnow()
+    stale = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    candidate = db.execute(select(JobModel.id, JobModel.status)
+                           .where(or_(and_(JobModel.status == QUEUED, JobModel.run_at <= now),
+                                      and_(JobModel.status == RUNNING, JobModel.locked_at < stale)))
+                           .order_by(JobModel.run_at, JobModel.id)
+                           .limit(1)
+                           .with_for_update(skip_locked=True)).first()
+    if candidate is None:
+        db.commit()
+        return None
+    job = db.scalar(update(JobModel)
+                    .where(JobModel.id == candidate.id, JobModel.status == candidate.status)
+                    .values(status=RUNNING, locked_by=worker_id, locked_at=now,
+                            attempts=JobModel.attempts + 1, updated_date=now)
+                    .returning(JobModel))
+    if job is not None:
+        # detached as loaded, so reading it after the commit needs no refresh
+        db.expunge(job)
+    db.commit()
+    return job
+
+
+def finish_job(db: Session, job_id: int, worker_id: str, result: Any = None) -> None:
+    now = utcnow()
+    # guarded by locked_by: a worker whose job was reclaimed as stale must not overwrite the new attempt
+    db.execute(update(JobModel)
+               .where(JobModel.id == job_id, JobModel.locked_by == worker_id, JobModel.status == RUNNING)
+               .values(status=SUCCEEDED, result=result, error=None, locked_by=None, locked_at=None,
+                       updated_date=now))
+    db.commit()
+
+
+def fail_job(db: Session, job: JobModel, worker_id: str, error: str) -> None:
+    """Requeue the job with exponential backoff, or mark it failed once its attempts are used up."""
+    now = utcnow()
+    if job.attempts < job.max_attempts:
+        values = {"status": QUEUED,
+                  "run_at": now + timedelta(seconds=settings.JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1))}
+    else:
+        values = {"status": FAILED}
+    db.execute(update(JobModel)
+               .where(JobModel.id == job.id, JobModel.locked_by == worker_id, JobModel.status == RUNNING)
+               .values(**values, error=error, locked_by=None, locked_at=None, updated_date=now))
+    db.commit()
+
+
+def set_progress(db: Session, job_id: int, progress: Dict[str, Any]) -> None:
+    db.execute(update(JobModel).filter_by(id=job_id).values(progress=progress, updated_date=utcnow()))
+    db.commit()
+
+
+def purge_jobs(db: Session, older_than: timedelta) -> int:
+    """Delete succeeded and failed jobs last touched before `older_than` ago; returns how many. Commits."""
+    result = db.execute(delete(JobModel)
+                        .where(JobModel.status.in_([SUCCEEDED, FAILED]),
+                               JobModel.updated_date < utcnow() - older_than))
+    db.commit()
+    return result.rowcount
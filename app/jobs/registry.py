@@ -0,0 +1,32 @@
+from typing import Any, Callable, Dict
+from app.jobs.queue import set_progress
+
+
+# job name -> handler(context), filled by the @job decorator in app.jobs.handlers
+JOB_HANDLERS: Dict[str, Callable[["JobContext"], Any]] = {}
+
+
+def job(name: str):
+    """Register the decorated function as the handler of jobs called `name`.
+
+    Handlers run in a worker process, may block, and may be coroutine functions.
+    They get a JobContext and return a JSON serializable result; raising fails the
+    attempt.
+    """
+    def decorator(func):
+        JOB_HANDLERS[name] = func
+        return func
+    return decorator
+
+
+class JobContext:
+    def __init__(self, job_id: int, payload: Dict[str, Any], attempt: int, session_factory):
+        self.job_id = job_id
+        self.payload = payload
+        self.attempt = attempt
+        self.session_factory = session_factory
+
+    def progress(self, **progress) -> None:
+        """Publish progress (shown by GET /jobs/{id}), in its own transaction."""
+        with self.session_factory() as db:
+            set_progress(db, self.job_id, progress)
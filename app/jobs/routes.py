@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Path, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.jobs.models import JobModel
+from app.jobs.schemas import JobResponseSchema
+from app.auth.jwt_auth import get_authenticated_user
+from app.auth.principal import Principal
+
+
+router = APIRouter(tags=["jobs"], prefix="/jobs")
+
+
+@router.get("/{job_id}", response_model=JobResponseSchema)
+async def retrieve_job(job_id: int = Path(..., gt=0),
+                       db: AsyncSession = Depends(get_async_db),
+                       user: Principal = Depends(get_authenticated_user)):
+    # always the primary: progress is written by the workers and must not lag
+    job_object = await db.scalar(select(JobModel).filter_by(id=job_id, user_id=user.id))
+    if not job_object:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job_object
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+
+class JobResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description='Unique identifier of the job')
+    name: str = Field(..., description='name of the job handler')
+    status: str = Field(..., description='queued, running, succeeded or failed')
+    attempts: int = Field(..., description='attempts started so far')
+    max_attempts: int = Field(..., description='attempts allowed before the job fails')
+    run_at: datetime = Field(..., description='earliest time of the next attempt (UTC)')
+    progress: Optional[Dict[str, Any]] = Field(None, description='last progress reported by the job')
+    result: Optional[Any] = Field(None, description='return value of the job once succeeded')
+    error: Optional[str] = Field(None, description='error of the last failed attempt')
+    created_date: datetime = Field(..., description='creation date and time of the job')
+    updated_date: datetime = Field(..., description='date and time of the last change of the job')
+
+
+class JobCreatedSchema(BaseModel):
+    job_id: int = Field(..., description='identifier of the queued job')
+    status_url: str = Field(..., description='poll this url for the state of the job')
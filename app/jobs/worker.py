@@ -0,0 +1,130 @@
+"""Job worker processes and the periodic job scheduler.
+
+    cd app && PYTHONPATH=.. python -m app.jobs.worker --processes 4
+
+starts a supervisor with 4 worker processes, each running one job at a time, so
+at most 4 jobs run concurrently per supervisor. Crashed workers are restarted.
+The supervisor also runs the APScheduler that enqueues PERIODIC_JOBS; every
+period is enqueued once however many supervisors run (see enqueue_once).
+"""
+import argparse
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from typing import Optional
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.jobs.queue import claim_job, enqueue_once, fail_job, finish_job
+from app.jobs.registry import JOB_HANDLERS, JobContext
+import app.jobs.handlers  # noqa: F401 - registers the handlers
+from app.tasks.models import TaskModel  # noqa: F401 - registers the relationship targets of the models
+from app.users.models import UserModel  # noqa: F401
+
+
+logger = logging.getLogger("app.jobs")
+
+# (job name, interval in seconds)
+PERIODIC_JOBS = [
+    ("log_time", 60),
+    ("purge_jobs", 3600),
+    ("sweep_tokens", 3600),
+]
+
+
+class Worker:
+    def __init__(self, worker_id: str, session_factory=SessionLocal, poll_interval: Optional[float] = None):
+        self.worker_id = worker_id
+        self.session_factory = session_factory
+        self.poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+
+    def run_once(self) -> bool:
+        """Claim and run one job; returns False when none was due."""
+        with self.session_factory() as db:
+            job = claim_job(db, self.worker_id)
+            if job is None:
+                return False
+            if job.attempts > job.max_attempts:
+                # reclaimed after its worker died during the last allowed attempt
+                fail_job(db, job, self.worker_id, "abandoned by its worker")
+                return True
+            try:
+                handler = JOB_HANDLERS.get(job.name)
+                if handler is None:
+                    raise LookupError(f"no handler registered for job '{job.name}'")
+                result = handler(JobContext(job.id, job.payload, job.attempts, self.session_factory))
+                if inspect.isawaitable(result):
+                    result = asyncio.run(result)
+            except Exception as e:
+                logger.exception("job %s (%s) attempt %s failed", job.id, job.name, job.attempts)
+                fail_job(db, job, self.worker_id, f"{type(e).__name__}: {e}")
+            else:
+                finish_job(db, job.id, self.worker_id, result)
+            return True
+
+    def run(self, stop) -> None:
+        while not stop.is_set():
+            if not self.run_once():
+                stop.wait(self.poll_interval)
+
+
+def run_worker(stop) -> None:
+    # the supervisor owns ctrl-c and stops the workers through `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    Worker(f"{socket.gethostname()}:{os.getpid()}").run(stop)
+
+
+def enqueue_periodic(name: str, interval: int) -> None:
+    with SessionLocal() as db:
+        enqueue_once(db, name, unique_key=f"{name}:{int(time.time() // interval)}")
+
+
+def start_scheduler() -> BackgroundScheduler:
+    scheduler = BackgroundScheduler()
+    for name, interval in PERIODIC_JOBS:
+        scheduler.add_job(enqueue_periodic, IntervalTrigger(seconds=interval), args=(name, interval))
+    scheduler.start()
+    return scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run background job workers")
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKER_PROCESSES,
+                        help="worker processes, i.e. jobs running at the same time")
+    parser.add_argument("--no-scheduler", action="store_true", help="do not enqueue the periodic jobs")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    stopping = []
+    # only flag it here, setting the event from a signal handler can deadlock with a wait on it
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.append(True))
+
+    scheduler = None if args.no_scheduler else start_scheduler()
+    workers = [None] * args.processes
+    while not stopping:
+        for index, process in enumerate(workers):
+            if process is None or not process.is_alive():
+                if process is not None:
+                    logger.warning("worker %s exited with %s, restarting", process.pid, process.exitcode)
+                workers[index] = context.Process(target=run_worker, args=(stop,), name=f"job-worker-{index}")
+                workers[index].start()
+        time.sleep(1)
+
+    stop.set()
+    if scheduler is not None:
+        scheduler.shutdown()
+    for process in workers:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
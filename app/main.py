@@ -1,36 +1,47 @@
-from fastapi import FastAPI, Depends, HTTPException, Request, status, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 from app.tasks.routes import router as tasks_routes
 from app.users.routes import router as users_routes
+from app.internal.routes import router as internal_routes
+from app.weather.routes import router as weather_routes
+from app.core.http import create_http_client
+from app.jobs.routes import router as jobs_routes
+from app.jobs.queue import enqueue
+from app.jobs.schemas import JobCreatedSchema
+from app.auth.jwt_auth import get_authenticated_user
+from app.auth.principal import Principal
+from app.core.database import get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.responses import AppJSONResponse
+from app.core.instrumentation import request_instrumentation, log_request
+from app.core.metrics import PrometheusMiddleware, instrument_engine_pool, mark_worker_dead, render_metrics
+from app.core.database import engine
+from app.core.ratelimit import LoadSheddingMiddleware, RateLimitMiddleware, rate_limiter
+from app.core.config import settings
+from app.auth.hashing import password_hasher
+from app.core.database import async_engine, replica_async_engine
 import uvicorn
 import time
-import random
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-import httpx
 
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
-from fastapi_cache.decorator import cache
-
-
-scheduler = AsyncIOScheduler()
-
-
-def my_task():
-    print(f"task executed at {time.strftime('%Y-%m-%d %H:%M:%S')}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print('**********application startup**********')
-    # scheduler.add_job(my_task, IntervalTrigger(seconds=2))
-    # scheduler.start()
+    # background and periodic jobs run in the app.jobs.worker processes
+    app.state.http_client = create_http_client()
     yield
-    # scheduler.shutdown()
+    await app.state.http_client.aclose()
+    password_hasher.shutdown()
+    await async_engine.dispose()
+    if replica_async_engine is not None:
+        await replica_async_engine.dispose()
+    mark_worker_dead()
     print('**********application shutdown**********')
 
 
@@ -47,21 +58,43 @@ app = FastAPI(
         "name": "MIT License",
     },
     lifespan=lifespan,
+    default_response_class=AppJSONResponse,
 )
 
 app.include_router(tasks_routes, prefix="")
 app.include_router(users_routes, prefix="")
+app.include_router(internal_routes, prefix="")
+app.include_router(jobs_routes, prefix="")
+app.include_router(weather_routes, prefix="")
+
+# added innermost first: metrics see the 429/503 answers, shedding happens before any bucket lookup
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+app.add_middleware(LoadSheddingMiddleware, max_in_flight=settings.MAX_IN_FLIGHT_REQUESTS)
+app.add_middleware(PrometheusMiddleware)
+instrument_engine_pool("sync", engine)
+instrument_engine_pool("primary", async_engine.sync_engine)
+if replica_async_engine is not None:
+    instrument_engine_pool("replica", replica_async_engine.sync_engine)
 
 
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.perf_counter()
-    response = await call_next(request)
+    with request_instrumentation() as metrics:
+        response = await call_next(request)
     process_time = time.perf_counter() - start_time
     response.headers["X-Process-Time"] = str(process_time)
+    response.headers["Server-Timing"] = metrics.server_timing(process_time)
+    log_request(request.method, request.url.path, response.status_code, process_time, metrics)
     return response
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
 # origins = [
 #     "http://127.0.1:5500/",
 #     "http://localhost.tiangolo.com",
@@ -85,7 +118,7 @@ async def http_exception_handler(request: Request, exc):
         "status_code": exc.status_code,
         "detail": str(exc.detail),
     }
-    return JSONResponse(status_code=exc.status_code, content=error_response)
+    return JSONResponse(status_code=exc.status_code, content=error_response, headers=exc.headers)
 
 
 @app.exception_handler(RequestValidationError)
@@ -99,68 +132,15 @@ async def http_exception_handler(request: Request, exc):
     return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=error_response)
 
 
-task_counter = 1
+@app.get("/init-task", status_code=status.HTTP_202_ACCEPTED, response_model=JobCreatedSchema)
+async def initiate_task(db: AsyncSession = Depends(get_async_db),
+                        user: Principal = Depends(get_authenticated_user)):
+    job_object = await enqueue(db, "demo", user_id=user.id)
+    await db.commit()
+    return {"job_id": job_object.id, "status_url": app.url_path_for("retrieve_job", job_id=job_object.id)}
 
 
-def start_task(task_id):
-    print(f"doing task {task_id}")
-    time.sleep(random.randint(3, 10))
-    print(f"done task {task_id}")
-
-
-@app.get("/init-task", status_code=status.HTTP_200_OK)
-async def initiate_task(background_tasks: BackgroundTasks):
-    global task_counter
-    background_tasks.add_task(start_task, task_id=task_counter)
-    task_counter += 1
-    return JSONResponse(status_code=status.HTTP_200_OK, content={"detail": f"task {task_counter} done."})
-
-
-cache_backend = InMemoryBackend()
-FastAPICache.init(cache_backend)
-
-async def request_current_weather(latitude: float, longitude: float):
-    url = "https://api.open-meteo.com/v1/forcast"
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "current": "temperature_2m, relative_humidity_2m",
-    }
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-
-    if response.status_code != 200:
-        data = response.json()
-        current_weather = data.get("current", {})
-        return current_weather
-    else:
-        return None
-
-# @app.get("/fetch-current-weather", status_code=status.HTTP_200_OK)
-# @cache(5)
-# async def fetch_current_weather(latitude: float = 40.7128, longitude: float = -74.0060):
-#     current_weather = await request_current_weather(latitude, longitude)
-#     if current_weather:
-#         return JSONResponse(status_code=status.HTTP_200_OK, content={"current_weather": current_weather})
-#     else:
-#         return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"detail": "failed to fetch current weather."})
-
-
-@app.get("/fetch-current-weather", status_code=status.HTTP_200_OK)
-@cache(5)
-async def fetch_current_weather(latitude: float = 40.7128, longitude: float = -74.0060):
-    cache_key = f"weather-{latitude}-{longitude}"
-    cache_data = await cache_backend.get(cache_key)
-    if cache_data:
-        return JSONResponse(status_code=status.HTTP_200_OK, content={"current_weather": cache_data})
-
-    current_weather = await request_current_weather(latitude, longitude)
-    if current_weather:
-        await cache_backend.set(cache_key, current_weather, 10)
-        return JSONResponse(status_code=status.HTTP_200_OK, content={"current_weather": current_weather})
-    else:
-        return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"detail": "failed to fetch current weather."})
+FastAPICache.init(InMemoryBackend())
 
 
 # if __name__ == "__main__":
@@ -0,0 +1,80 @@
+import hashlib
+import time
+from typing import Optional
+from fastapi_cache import FastAPICache
+from fastapi_cache.types import Backend
+from app.core.config import settings
+
+
+class TaskResponseCache:
+    """Per-user cache of serialized task responses.
+
+    Every entry key embeds the user's current generation token. Writes replace
+    that token (see `bump`), which orphans all of the user's cached responses at
+    once without having to enumerate them; orphans simply expire. Both the
+    entries and the generation tokens live in the cache backend, so a shared
+    backend gives consistent invalidation across workers.
+    """
+
+    def __init__(self, backend: Optional[Backend] = None, expire: int = 30, generation_expire: int = 24 * 3600):
+        self._backend = backend
+        self.expire = expire
+        self.generation_expire = generation_expire
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self) -> Backend:
+        # defaults to the backend given to FastAPICache.init in main
+        return self._backend or FastAPICache.get_backend()
+
+    @backend.setter
+    def backend(self, backend: Optional[Backend]) -> None:
+        self._backend = backend
+
+    def _generation_key(self, user_id: int) -> str:
+        return f"tasks:{user_id}:generation"
+
+    async def generation(self, user_id: int) -> str:
+        generation = await self.backend.get(self._generation_key(user_id))
+        if generation is None:
+            return await self.bump(user_id)
+        return generation.decode() if isinstance(generation, bytes) else str(generation)
+
+    async def bump(self, user_id: int) -> str:
+        generation = str(time.time_ns())
+        await self.backend.set(self._generation_key(user_id), generation.encode(), self.generation_expire)
+        return generation
+
+    async def key(self, user_id: int, *parts) -> str:
+        generation = await self.generation(user_id)
+        return f"tasks:{user_id}:{generation}:" + ":".join(str(part) for part in parts)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.backend.set(key, value, self.expire)
+
+    def etag(self, key: str) -> str:
+        """Strong validator of a response: the key changes whenever the user's tasks do."""
+        return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+
+task_cache = TaskResponseCache(expire=settings.TASK_CACHE_EXPIRE)
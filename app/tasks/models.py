@@ -1,10 +1,20 @@
-from sqlalchemy import Column, String, Text, Boolean, func, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, func, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.dialects import sqlite
 from app.core.database import Base
 from sqlalchemy.orm import relationship
 
 
+# SQLite stores CURRENT_TIMESTAMP without microseconds, bind parameters in the same
+# format so keyset comparisons on these columns compare like with like
+Timestamp = DateTime().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
+
+
 class TaskModel(Base):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # serves the keyset pagination of the task list (optionally filtered by is_completed)
+        Index('ix_tasks_user_id_is_completed_created_date_id', 'user_id', 'is_completed', 'created_date', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -12,7 +22,16 @@ class TaskModel(Base):
     description = Column(Text(500), nullable=True)
     is_completed = Column(Boolean, nullable=False, default=False)
 
-    created_date = Column(DateTime, nullable=False, server_default=func.now())
-    updated_date = Column(DateTime, nullable=False, server_default=func.now(), server_onupdate=func.now())
+    created_date = Column(Timestamp, nullable=False, server_default=func.now())
+    updated_date = Column(Timestamp, nullable=False, server_default=func.now(), server_onupdate=func.now())
+
+    user = relationship('UserModel', back_populates='tasks', uselist=False)
+
+
+class UserTaskStatsModel(Base):
+    """Task counters per user, kept in step with the tasks table by the task write endpoints."""
+    __tablename__ = 'user_task_stats'
 
-    user = relationship('UserModel', back_populates='tasks', uselist=False)
\ No newline at end of file
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    total = Column(Integer, nullable=False, default=0, server_default='0')
+    completed = Column(Integer, nullable=False, default=0, server_default='0')
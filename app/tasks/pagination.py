@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from fastapi import HTTPException, status
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    return json.loads(raw)
+
+
+def encode_cursor(created_date: datetime, task_id: int) -> str:
+    return _encode([created_date.isoformat(), task_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_date, task_id = _decode(cursor)
+        return datetime.fromisoformat(created_date), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_search_cursor(score: float, task_id: int) -> str:
+    # json keeps the shortest repr of the float, which round-trips exactly
+    return _encode([score, task_id])
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, task_id = _decode(cursor)
+        return float(score), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
@@ -1,81 +1,300 @@
-from fastapi import APIRouter, Path, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Path, Depends, HTTPException, status, Query, Header
+from fastapi.responses import JSONResponse, Response
 from app.tasks.schemas import *
-from app.tasks.models import TaskModel
-from app.users.models import UserModel
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from typing import List
+from app.tasks.models import TaskModel, UserTaskStatsModel
+from app.tasks.pagination import encode_cursor, decode_cursor, encode_search_cursor, decode_search_cursor
+from app.tasks.search import search_query
+from app.tasks.stats import apply_stats_delta, completed_delta
+from app.tasks.cache import task_cache, etag_matches
+from sqlalchemy import select, insert, update, delete, bindparam, func, tuple_
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.replica import get_async_read_db, read_your_writes
+from typing import List, Literal, Optional, Union
 from app.auth.jwt_auth import get_authenticated_user
+from app.auth.principal import Principal
 
 
 router = APIRouter(tags=["tasks"], prefix="/todos")
 
+# read endpoints select plain row tuples in TASK_RESPONSE_FIELDS order and serialize them directly
+TASK_RESPONSE_COLUMNS = [getattr(TaskModel, field) for field in TASK_RESPONSE_FIELDS]
 
-@router.get("/tasks", response_model=List[TaskResponseSchema])
+
+def cached_json_response(content: bytes, etag: str, hit: bool) -> Response:
+    return Response(content=content, media_type="application/json",
+                    headers={"ETag": etag, "X-Cache": "HIT" if hit else "MISS"})
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+async def after_write(user_id: int) -> None:
+    """Called after every committed task write of the user."""
+    await task_cache.bump(user_id)
+    await read_your_writes.mark(user_id)
+
+
+@router.get("/tasks", response_model=Union[List[TaskResponseSchema], TaskPageSchema])
 async def retrieve_tasks(
         completed: bool = Query(None, description="filter tasks based on being completed or not"),
         limit: int = Query(10, gt=0, le=50, description="limiting the number of items to retrieve"),
         offset: int = Query(0, ge=0, description="use for paginating based on passed items"),
-        db: Session = Depends(get_db),
-        user: UserModel = Depends(get_authenticated_user)):
-    query = db.query(TaskModel).filter_by(user_id=user.id)
+        pagination: Literal["offset", "cursor"] = Query("offset", description="offset returns a plain list, cursor returns a page with next_cursor"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page, implies cursor pagination"),
+        if_none_match: Optional[str] = Header(None),
+        db: AsyncSession = Depends(get_async_read_db),
+        user: Principal = Depends(get_authenticated_user)):
+    offset_mode = pagination == "offset" and cursor is None
+    cache_key = await task_cache.key(user.id, "list", completed, limit,
+                                     offset if offset_mode else None, cursor)
+    # validated against the user's generation only, before any cache or database read
+    etag = task_cache.etag(cache_key)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+    content = await task_cache.get(cache_key)
+    if content is not None:
+        return cached_json_response(content, etag, hit=True)
+
+    query = select(*TASK_RESPONSE_COLUMNS).filter_by(user_id=user.id)
     if completed is not None:
         query = query.filter_by(is_completed=completed)
+    query = query.order_by(TaskModel.created_date, TaskModel.id)
+
+    if offset_mode:
+        result = await db.execute(query.offset(offset).limit(limit))
+        content = task_rows_to_json(result.all())
+    else:
+        if cursor is not None:
+            query = query.where(tuple_(TaskModel.created_date, TaskModel.id) > decode_cursor(cursor))
+        # one extra row tells whether a next page exists
+        result = await db.execute(query.limit(limit + 1))
+        rows = result.all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_date, rows[-1].id)
+        content = task_page_to_json(rows, next_cursor)
+
+    await task_cache.set(cache_key, content)
+    return cached_json_response(content, etag, hit=False)
+
+
+@router.get("/tasks/search", response_model=TaskPageSchema)
+async def search_tasks(
+        q: str = Query(..., min_length=1, max_length=200, description="words to look for in title and description"),
+        limit: int = Query(10, gt=0, le=50, description="limiting the number of items to retrieve"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        if_none_match: Optional[str] = Header(None),
+        db: AsyncSession = Depends(get_async_read_db),
+        user: Principal = Depends(get_authenticated_user)):
+    cache_key = await task_cache.key(user.id, "search", q, limit, cursor)
+    etag = task_cache.etag(cache_key)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+    content = await task_cache.get(cache_key)
+    if content is not None:
+        return cached_json_response(content, etag, hit=True)
+
+    after = decode_search_cursor(cursor) if cursor is not None else None
+    query = search_query(db.get_bind().dialect.name, TASK_RESPONSE_COLUMNS, user.id, q, after)
+    rows, next_cursor = [], None
+    if query is not None:
+        result = await db.execute(query.limit(limit + 1))
+        rows = result.all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_search_cursor(rows[-1].score, rows[-1].id)
+    content = task_page_to_json(rows, next_cursor)
+
+    await task_cache.set(cache_key, content)
+    return cached_json_response(content, etag, hit=False)
+
 
-    return query.offset(offset).limit(limit).all()
+@router.get("/tasks/stats", response_model=TaskStatsSchema)
+async def retrieve_task_stats(db: AsyncSession = Depends(get_async_read_db),
+                              user: Principal = Depends(get_authenticated_user)):
+    result = await db.execute(select(UserTaskStatsModel.total, UserTaskStatsModel.completed)
+                              .filter_by(user_id=user.id))
+    row = result.first()
+    total, completed = (row.total, row.completed) if row else (0, 0)
+    return {"total": total, "completed": completed, "pending": total - completed}
 
 
 @router.get("/tasks/{task_id}", response_model=TaskResponseSchema)
 async def retrieve_tasks_detail(task_id: int = Path(..., gt=0),
-                                db: Session = Depends(get_db),
-                                user: UserModel = Depends(get_authenticated_user)):
-    task_object = db.query(TaskModel).filter_by(user_id = user.id, id=task_id).first()
-    if not task_object:
+                                if_none_match: Optional[str] = Header(None),
+                                db: AsyncSession = Depends(get_async_read_db),
+                                user: Principal = Depends(get_authenticated_user)):
+    cache_key = await task_cache.key(user.id, "detail", task_id)
+    etag = task_cache.etag(cache_key)
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag)
+    content = await task_cache.get(cache_key)
+    if content is not None:
+        return cached_json_response(content, etag, hit=True)
+
+    result = await db.execute(select(*TASK_RESPONSE_COLUMNS).filter_by(user_id=user.id, id=task_id))
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    return task_object
+    content = task_row_to_json(row)
+    await task_cache.set(cache_key, content)
+    return cached_json_response(content, etag, hit=False)
 
 
 @router.post("/tasks", response_model=TaskResponseSchema)
 async def create_task(request: TaskCreateSchema,
-                      db: Session = Depends(get_db),
-                      user: UserModel = Depends(get_authenticated_user)):
-
-    user = db.query(UserModel).filter_by(id=user.id).first()
-    if user:
-        data = request.model_dump()
-        data.update({"user_id": user.id})
-        task_object = TaskModel(**data)
-        db.add(task_object)
-        db.commit()
-        db.refresh(task_object)
-        return task_object
-    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="You are not authorized to perform this action")
+                      db: AsyncSession = Depends(get_async_db),
+                      user: Principal = Depends(get_authenticated_user)):
+    data = request.model_dump()
+    data.update({"user_id": user.id})
+    # INSERT ... RETURNING reads the server side dates back without a refresh
+    task_object = await db.scalar(insert(TaskModel).values(**data).returning(TaskModel))
+    await apply_stats_delta(db, user.id, total=1, completed=int(task_object.is_completed))
+    await db.commit()
+    await after_write(user.id)
+    return task_object
 
 @router.put("/tasks/{task_id}", response_model=TaskResponseSchema)
 async def update_task(request: TaskUpdateSchema,
                       task_id: int = Path(..., gt=0),
-                      db: Session = Depends(get_db)):
-    task_object = db.query(TaskModel).filter_by(id=task_id).first()
+                      db: AsyncSession = Depends(get_async_db),
+                      user: Principal = Depends(get_authenticated_user)):
+    data = request.model_dump(exclude_unset=True)
+    statement = (update(TaskModel)
+                 .filter_by(id=task_id, user_id=user.id)
+                 .values(**data, updated_date=func.now())
+                 .returning(TaskModel))
+    task_object = None
+    if "is_completed" in data:
+        # try the flipping update first, a match means the completed counter moves
+        task_object = await db.scalar(statement.where(TaskModel.is_completed != data["is_completed"]))
+        if task_object:
+            await apply_stats_delta(db, user.id, completed=1 if data["is_completed"] else -1)
+    if not task_object:
+        task_object = await db.scalar(statement)
     if not task_object:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-
-    for field, value in request.model_dump(exclude_unset=True).items():
-        setattr(task_object, field, value)
-
-    db.commit()
-    db.refresh(task_object)
+    await db.commit()
+    await after_write(user.id)
     return task_object
 
 
 @router.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(task_id: int = Path(..., gt=0),
-                      db: Session = Depends(get_db),
-                      user: UserModel = Depends(get_authenticated_user)):
-    task_object = db.query(TaskModel).filter_by(user_id=user.id, id=task_id).first()
-    if not task_object:
+                      db: AsyncSession = Depends(get_async_db),
+                      user: Principal = Depends(get_authenticated_user)):
+    result = await db.execute(delete(TaskModel)
+                              .filter_by(user_id=user.id, id=task_id)
+                              .returning(TaskModel.id, TaskModel.is_completed))
+    deleted = result.first()
+    if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    await apply_stats_delta(db, user.id, total=-1, completed=-int(deleted.is_completed))
+    await db.commit()
+    await after_write(user.id)
+
+
+def validate_batch_items(items, schema):
+    """Split raw batch items into (index, validated) pairs and per item 422 results."""
+    valid, results = [], {}
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            results[index] = TaskBatchResultSchema(index=index,
+                                                   status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                                   detail=e.errors(include_url=False, include_context=False))
+    return valid, results
+
+
+@router.post("/tasks:batch", response_model=TaskBatchResponseSchema)
+async def create_tasks_batch(request: TaskBatchCreateSchema,
+                             db: AsyncSession = Depends(get_async_db),
+                             user: Principal = Depends(get_authenticated_user)):
+    valid, results = validate_batch_items(request.items, TaskCreateSchema)
+    if valid:
+        # one multi-row INSERT ... RETURNING, rows come back in parameter order
+        rows = [{**item.model_dump(), "user_id": user.id} for _, item in valid]
+        result = await db.scalars(insert(TaskModel).returning(TaskModel, sort_by_parameter_order=True), rows)
+        created = result.all()
+        for (index, _), task_object in zip(valid, created):
+            results[index] = TaskBatchResultSchema(index=index, status_code=status.HTTP_201_CREATED,
+                                                   id=task_object.id, task=task_object)
+        await apply_stats_delta(db, user.id, total=len(created),
+                                completed=sum(task_object.is_completed for task_object in created))
+        await db.commit()
+        await after_write(user.id)
+    return {"results": [results[index] for index in sorted(results)]}
+
+
+@router.patch("/tasks:batch", response_model=TaskBatchResponseSchema)
+async def update_tasks_batch(request: TaskBatchUpdateSchema,
+                             db: AsyncSession = Depends(get_async_db),
+                             user: Principal = Depends(get_authenticated_user)):
+    valid, results = validate_batch_items(request.items, TaskBatchUpdateItemSchema)
+    if valid:
+        # a single executemany UPDATE scoped to the user, then one SELECT ... WHERE id IN
+        # to read the rows back; ids the user does not own are simply not matched
+        # current completion state of the touched rows, locked until commit, for the stats delta
+        result = await db.execute(select(TaskModel.id, TaskModel.is_completed)
+                                  .filter_by(user_id=user.id)
+                                  .where(TaskModel.id.in_([item.id for _, item in valid]))
+                                  .with_for_update())
+        completion = dict(result.all())
+        delta = 0
+        for _, item in valid:
+            if item.id in completion:
+                delta += completed_delta(completion[item.id], item.is_completed)
+                completion[item.id] = item.is_completed
+        await apply_stats_delta(db, user.id, completed=delta)
+
+        table = TaskModel.__table__
+        statement = (update(table)
+                     .where(table.c.id == bindparam("b_id"), table.c.user_id == user.id)
+                     .values(title=bindparam("b_title"),
+                             description=bindparam("b_description"),
+                             is_completed=bindparam("b_is_completed"),
+                             updated_date=func.now()))
+        await db.execute(statement, [{f"b_{field}": value for field, value in item.model_dump().items()}
+                                     for _, item in valid])
+        result = await db.scalars(select(TaskModel)
+                                  .filter_by(user_id=user.id)
+                                  .where(TaskModel.id.in_([item.id for _, item in valid]))
+                                  .execution_options(populate_existing=True))
+        updated = {task_object.id: task_object for task_object in result.all()}
+        await db.commit()
+        await after_write(user.id)
+        for index, item in valid:
+            if item.id in updated:
+                results[index] = TaskBatchResultSchema(index=index, status_code=status.HTTP_200_OK,
+                                                       id=item.id, task=updated[item.id])
+            else:
+                results[index] = TaskBatchResultSchema(index=index, status_code=status.HTTP_404_NOT_FOUND,
+                                                       id=item.id, detail="Task not found")
+    return {"results": [results[index] for index in sorted(results)]}
+
 
-    db.delete(task_object)
-    db.commit()
+@router.delete("/tasks:batch", response_model=TaskBatchResponseSchema)
+async def delete_tasks_batch(request: TaskBatchDeleteSchema,
+                             db: AsyncSession = Depends(get_async_db),
+                             user: Principal = Depends(get_authenticated_user)):
+    result = await db.execute(delete(TaskModel)
+                              .filter_by(user_id=user.id)
+                              .where(TaskModel.id.in_(request.ids))
+                              .returning(TaskModel.id, TaskModel.is_completed))
+    rows = result.all()
+    deleted = {row.id for row in rows}
+    await apply_stats_delta(db, user.id, total=-len(rows), completed=-sum(row.is_completed for row in rows))
+    await db.commit()
+    if deleted:
+        await after_write(user.id)
+    return {"results": [
+        TaskBatchResultSchema(index=index, id=task_id,
+                              status_code=status.HTTP_204_NO_CONTENT if task_id in deleted else status.HTTP_404_NOT_FOUND,
+                              detail=None if task_id in deleted else "Task not found")
+        for index, task_id in enumerate(request.ids)
+    ]}
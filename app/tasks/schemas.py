@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import Any, Dict, List, Optional
 from datetime import datetime
+from app.core.config import settings
+from app.core.responses import dump_json
 
 
 class TaskBaseSchema(BaseModel):
@@ -18,7 +20,76 @@ class TaskUpdateSchema(TaskBaseSchema):
 
 
 class TaskResponseSchema(TaskBaseSchema):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int = Field(..., description='Unique identifier of the object')
 
     created_date: datetime = Field(..., description='creation date and time of the object')
-    updated_date: datetime = Field(..., description='updating date and time of the object')
\ No newline at end of file
+    updated_date: datetime = Field(..., description='updating date and time of the object')
+
+TaskListAdapter = TypeAdapter(List[TaskResponseSchema])
+
+# column order of the row tuples accepted by the task_row(s)_to_json helpers, same as
+# the field order pydantic renders so both paths produce identical bytes
+TASK_RESPONSE_FIELDS = tuple(TaskResponseSchema.model_fields)
+
+
+def task_row_to_dict(row) -> dict:
+    return dict(zip(TASK_RESPONSE_FIELDS, row))
+
+
+def task_row_to_json(row) -> bytes:
+    """Serialize one trusted database row without a TaskResponseSchema validation round."""
+    return dump_json(task_row_to_dict(row))
+
+
+def task_rows_to_json(rows) -> bytes:
+    return dump_json([task_row_to_dict(row) for row in rows])
+
+
+def task_page_to_json(rows, next_cursor: Optional[str]) -> bytes:
+    return dump_json({"items": [task_row_to_dict(row) for row in rows], "next_cursor": next_cursor})
+
+
+class TaskPageSchema(BaseModel):
+    items: List[TaskResponseSchema] = Field(..., description='tasks of the current page')
+    next_cursor: Optional[str] = Field(None, description='cursor of the next page, null on the last page')
+
+
+
+class TaskStatsSchema(BaseModel):
+    total: int = Field(..., description='number of tasks of the user')
+    completed: int = Field(..., description='number of completed tasks')
+    pending: int = Field(..., description='number of tasks not completed yet')
+
+
+class TaskBatchUpdateItemSchema(TaskUpdateSchema):
+    id: int = Field(..., gt=0, description='Unique identifier of the task to update')
+
+
+class TaskBatchCreateSchema(BaseModel):
+    # items are validated one by one against TaskCreateSchema so a bad item only fails itself
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=settings.TASK_BATCH_MAX_ITEMS,
+                                        description='tasks to create')
+
+
+class TaskBatchUpdateSchema(BaseModel):
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=settings.TASK_BATCH_MAX_ITEMS,
+                                        description='tasks to update, each with its id')
+
+
+class TaskBatchDeleteSchema(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=settings.TASK_BATCH_MAX_ITEMS,
+                           description='identifiers of the tasks to delete')
+
+
+class TaskBatchResultSchema(BaseModel):
+    index: int = Field(..., description='position of the item in the request')
+    status_code: int = Field(..., description='http status of this item')
+    id: Optional[int] = Field(None, description='identifier of the task')
+    task: Optional[TaskResponseSchema] = Field(None, description='task after the operation')
+    detail: Optional[Any] = Field(None, description='error details of a failed item')
+
+
+class TaskBatchResponseSchema(BaseModel):
+    results: List[TaskBatchResultSchema] = Field(..., description='per item results in request order')
@@ -0,0 +1,81 @@
+"""Full-text search over task title and description.
+
+Postgres keeps a generated ``tasks.search_vector`` tsvector column behind a GIN
+index, SQLite (tests and dev) an external content FTS5 table ``tasks_fts`` kept in
+sync by triggers. Neither is mapped on TaskModel, the DDL below is attached to the
+tasks table so ``create_all`` builds it, the Alembic revision does the same for
+existing databases.
+"""
+import re
+from typing import Optional, Tuple
+from sqlalchemy import DDL, event, func, literal_column, select, table, column, tuple_
+from app.tasks.models import TaskModel
+
+
+SEARCH_CONFIG = "english"
+
+POSTGRES_DDL = [
+    "ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    f"to_tsvector('{SEARCH_CONFIG}', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED",
+    "CREATE INDEX ix_tasks_search_vector ON tasks USING gin (search_vector)",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, content='tasks', content_rowid='id')",
+    "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+for statement in POSTGRES_DDL:
+    event.listen(TaskModel.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_DDL:
+    event.listen(TaskModel.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+# the triggers go with the tasks table, the virtual table does not
+event.listen(TaskModel.__table__, "before_drop", DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"))
+
+tasks_fts = table("tasks_fts", column("rowid"))
+
+
+def fts5_match_expression(q: str) -> Optional[str]:
+    """All words of `q` as quoted FTS5 strings, so user input can never be a syntax error."""
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+def search_query(dialect: str, columns, user_id: int, q: str, after: Optional[Tuple[float, int]] = None):
+    """Ranked matches of `q` among the user's tasks, best first; None when `q` holds no words.
+
+    The statement returns `columns` followed by a `score` column (higher is better),
+    `after` is the (score, id) of the last row of the previous page.
+    """
+    if dialect == "postgresql":
+        query_vector = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+        search_vector = literal_column("tasks.search_vector")
+        score = func.ts_rank(search_vector, query_vector)
+        matches = (select(*columns, score.label("score"))
+                   .where(TaskModel.user_id == user_id, search_vector.op("@@")(query_vector)))
+    else:
+        match = fts5_match_expression(q)
+        if match is None:
+            return None
+        # bm25() is lower for better matches
+        score = -func.bm25(literal_column("tasks_fts"))
+        matches = (select(*columns, score.label("score"))
+                   .select_from(TaskModel)
+                   .join(tasks_fts, tasks_fts.c.rowid == TaskModel.id)
+                   .where(TaskModel.user_id == user_id, literal_column("tasks_fts").op("MATCH")(match)))
+
+    matches = matches.subquery()
+    query = select(matches).order_by(matches.c.score.desc(), matches.c.id.desc())
+    if after is not None:
+        query = query.where(tuple_(matches.c.score, matches.c.id) < after)
+    return query
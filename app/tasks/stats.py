@@ -0,0 +1,67 @@
+"""Per-user task counters.
+
+Every task write adjusts ``user_task_stats`` in its own transaction through
+``apply_stats_delta``, so reading the summary is a primary key lookup. Writes
+that bypass the API (raw SQL, restores) can make the counters drift, rebuild them
+from the tasks table with
+
+    cd app && PYTHONPATH=.. python -m app.tasks.stats [--user-id ID ...]
+"""
+import argparse
+from typing import Iterable, Optional
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, upsert_insert
+from app.tasks.models import TaskModel, UserTaskStatsModel
+from app.users.models import UserModel  # noqa: F401 - registers the TaskModel.user relationship target
+
+
+async def apply_stats_delta(db: AsyncSession, user_id: int, total: int = 0, completed: int = 0) -> None:
+    """Add the deltas to the user's counters (creating the row on first use), in the caller's transaction."""
+    if not total and not completed:
+        return
+    table = UserTaskStatsModel.__table__
+    statement = upsert_insert(db, table).values(
+        user_id=user_id, total=total, completed=completed)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={"total": table.c.total + statement.excluded.total,
+              "completed": table.c.completed + statement.excluded.completed}))
+
+
+def completed_delta(before: bool, after: bool) -> int:
+    return int(bool(after)) - int(bool(before))
+
+
+def rebuild_task_stats(db: Session, user_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute the counters from the tasks table (all users or just `user_ids`); returns the rows written."""
+    table = UserTaskStatsModel.__table__
+    counts = (select(TaskModel.user_id,
+                     func.count().label("total"),
+                     func.coalesce(func.sum(case((TaskModel.is_completed, 1), else_=0)), 0).label("completed"))
+              .where(TaskModel.user_id.is_not(None))
+              .group_by(TaskModel.user_id))
+    clear = delete(table)
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        counts = counts.where(TaskModel.user_id.in_(user_ids))
+        clear = clear.where(table.c.user_id.in_(user_ids))
+    db.execute(clear)
+    result = db.execute(insert(table).from_select(["user_id", "total", "completed"], counts))
+    db.commit()
+    return result.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="rebuild user_task_stats from the tasks table")
+    parser.add_argument("--user-id", type=int, action="append", dest="user_ids",
+                        help="only rebuild these users (repeatable), default all")
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        rows = rebuild_task_stats(db, args.user_ids)
+    print(f"rebuilt task stats of {rows} users")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 from fastapi.testclient import TestClient
-from app.core.database import Base, create_engine, sessionmaker, get_db
-from sqlalchemy import StaticPool
+from app.core.database import Base, create_engine, sessionmaker, get_db, get_async_db, get_async_replica_db, get_async_database_url
+from sqlalchemy import StaticPool, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from main import app
 import pytest
 from app.tasks.models import TaskModel
+from app.tasks.stats import rebuild_task_stats
+from app.core.ratelimit import rate_limiter
 from app.users.models import UserModel
 from faker import Faker
 from app.auth.jwt_auth import generate_access_token
@@ -11,7 +14,9 @@ from app.auth.jwt_auth import generate_access_token
 
 fake = Faker()
 
-SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+# named shared-cache in-memory database, so the sync fixtures and the async
+# application sessions see the same tables
+SQLALCHEMY_DATABASE_URI = 'sqlite:///file:testdb?mode=memory&cache=shared&uri=true'
 
 engine = create_engine(
        SQLALCHEMY_DATABASE_URI,
@@ -19,7 +24,18 @@ engine = create_engine(
        poolclass=StaticPool
    )
 
+async_engine = create_async_engine(
+       get_async_database_url(SQLALCHEMY_DATABASE_URI),
+       poolclass=StaticPool
+   )
+
 TestSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+TestAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def override_get_async_db():
+    async with TestAsyncSessionLocal() as db:
+        yield db
 
 
 @pytest.fixture(scope='package')
@@ -33,8 +49,19 @@ def db_session():
 @pytest.fixture(scope='module', autouse=True)
 def override_dependencies(db_session):
     app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_replica_db] = override_get_async_db
     yield
     app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_async_db, None)
+    app.dependency_overrides.pop(get_async_replica_db, None)
+
+@pytest.fixture(scope='session', autouse=True)
+def disable_rate_limiting():
+    # the suite sends far more requests than any budget, test_ratelimit turns it back on
+    rate_limiter.enabled = False
+    yield
+    rate_limiter.enabled = True
 
 @pytest.fixture(scope='session', autouse=True)
 def tear_up_and_down_database():
@@ -78,8 +105,41 @@ def generate_mock_data(db_session):
         )
     db_session.add_all(task_list)
     db_session.commit()
+    rebuild_task_stats(db_session, [user.id])
     print(f"added 10 Task For User with User_id: {user.id}")
 
+class FakeSharedBackend:
+    """Stands in for a shared (redis-like) cache backend: stores bytes only, no TTL bookkeeping."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, expire=None):
+        assert isinstance(value, bytes)
+        self.store[key] = bytes(value)
+
+
+@pytest.fixture(scope='function')
+def shared_backend():
+    return FakeSharedBackend()
+
+
+@pytest.fixture(scope='function')
+def query_counter():
+    """Collects every SQL statement the application sessions send to the database."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
 @pytest.fixture(scope='function')
 def random_task(db_session):
     user = db_session.query(UserModel).filter_by(username="test_user").first()
@@ -0,0 +1,15 @@
+from app.benchmarks.load import percentile, compare
+
+
+def test_percentile_nearest_rank():
+    values = sorted(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) == 0.0
+
+def test_compare_reports_relative_change():
+    baseline = {"revision": "abc", "endpoints": {"list": {"p50_ms": 10.0, "rps": 100.0, "queries_per_request": None}}}
+    report = {"endpoints": {"list": {"p50_ms": 12.0, "rps": 80.0, "queries_per_request": None}}}
+    assert compare(report, baseline) == {"baseline_revision": "abc",
+                                         "change_percent": {"list": {"p50_ms": 20.0, "rps": -20.0}}}
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+from app.core.database import get_engine_options
+from app.core.pool import InstrumentedQueuePool, pool_status
+
+
+def test_engine_options_are_dialect_aware():
+    options = get_engine_options("sqlite:///file:db?mode=memory&cache=shared&uri=true")
+    assert options == {"connect_args": {"check_same_thread": False}}
+
+    options = get_engine_options("sqlite+aiosqlite:///./sqlite.db")
+    assert options["connect_args"] == {}
+    assert options["pool_size"] > 0
+
+    options = get_engine_options("postgresql://postgres:postgres@db:5432/postgres")
+    assert "check_same_thread" not in options["connect_args"]
+    assert options["poolclass"] is InstrumentedQueuePool
+
+def test_pool_stats_count_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+        assert pool_status(engine)["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    engine.dispose()
+
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 1
+    assert status["checkout_timeouts"] == 1
+    assert status["wait_seconds_max"] >= 0.05
+
+def test_internal_pool_endpoint(anonymous_client):
+    response = anonymous_client.get("internal/pool")
+    assert response.status_code == 200
+    assert {"sync", "async"} <= response.json().keys()
@@ -0,0 +1,27 @@
+from sqlalchemy import create_engine, func, select
+from app.core.database import Base
+from app.datagen import bulk_seed
+from app.tasks.models import TaskModel, UserTaskStatsModel
+from app.users.models import UserModel, pwd_context
+
+
+def test_bulk_seed_chunks_users_and_tasks(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'seed.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+
+    messages = []
+    summary = bulk_seed(database_url, users=5, tasks_per_user=7, username_prefix="bulk",
+                        users_per_chunk=2, chunk_size=4, report=messages.append)
+    assert (summary["users"], summary["tasks"]) == (5, 35)
+    assert len(messages) == 3
+
+    with engine.connect() as connection:
+        assert connection.scalar(select(func.count()).select_from(TaskModel)) == 35
+        assert connection.scalar(select(func.sum(UserTaskStatsModel.total))) == 35
+        assert connection.scalar(select(func.sum(UserTaskStatsModel.completed))) == connection.scalar(
+            select(func.count()).select_from(TaskModel).where(TaskModel.is_completed))
+        hashes = connection.execute(select(UserModel.password)).scalars().all()
+    assert len(set(hashes)) == 1
+    assert pwd_context.verify("123456789", hashes[0])
+    engine.dispose()
@@ -0,0 +1,30 @@
+import logging
+from sqlalchemy import text
+from app.core.instrumentation import request_instrumentation, statement_shape
+
+
+def test_server_timing_reports_queries(auth_client):
+    # an uncached page so the handler has to query
+    response = auth_client.get("todos/tasks", params={"limit": 37})
+    server_timing = response.headers["Server-Timing"]
+    assert 'db;dur=' in server_timing
+    assert '"0 queries"' not in server_timing
+    assert "total;dur=" in server_timing
+
+def test_password_hash_timing(anonymous_client):
+    response = anonymous_client.post("/users/login", json={"username": "test_user", "password": "123"})
+    assert "password-hash;dur=" in response.headers["Server-Timing"]
+
+def test_statement_shape_collapses_parameter_lists():
+    assert statement_shape("SELECT id FROM tasks\n WHERE id IN (?, ?, ?)") == statement_shape(
+        "SELECT id FROM tasks WHERE id IN (?)")
+
+def test_n_plus_one_detector_warns(db_session, caplog, monkeypatch):
+    from app.core import instrumentation
+    monkeypatch.setattr(instrumentation.settings, "N_PLUS_ONE_THRESHOLD", 3)
+    with caplog.at_level(logging.WARNING, logger="app.requests"):
+        with request_instrumentation() as metrics:
+            for task_id in range(5):
+                db_session.execute(text("SELECT title FROM tasks WHERE id = :id"), {"id": task_id})
+    assert metrics.query_count == 5
+    assert len([record for record in caplog.records if "N+1" in record.message]) == 1
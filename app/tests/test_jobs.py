@@ -0,0 +1,76 @@
+from datetime import timedelta
+import pytest
+from sqlalchemy import update
+from app.jobs.models import JobModel
+from app.jobs.queue import claim_job, enqueue_once, utcnow
+from app.jobs.registry import JOB_HANDLERS
+from app.jobs.worker import Worker
+from tests.conftest import TestSessionLocal
+
+
+@pytest.fixture()
+def worker():
+    return Worker("test-worker", session_factory=TestSessionLocal, poll_interval=0)
+
+
+@pytest.fixture()
+def handlers(monkeypatch):
+    monkeypatch.setitem(JOB_HANDLERS, "demo", lambda context: context.progress(done=1) or {"ok": context.attempt})
+    return JOB_HANDLERS
+
+
+def test_init_task_enqueues_and_worker_runs_it(auth_client, worker, handlers):
+    response = auth_client.get("/init-task")
+    assert response.status_code == 202
+    job_url = response.json()["status_url"]
+    assert auth_client.get(job_url).json()["status"] == "queued"
+
+    assert worker.run_once() is True
+    job = auth_client.get(job_url).json()
+    assert (job["status"], job["attempts"], job["result"], job["progress"]) == ("succeeded", 1, {"ok": 1}, {"done": 1})
+    assert worker.run_once() is False
+
+def test_jobs_of_other_users_are_hidden(auth_client, anonymous_client, db_session):
+    job = JobModel(name="demo", payload={}, max_attempts=1, run_at=utcnow(), status="succeeded")
+    db_session.add(job)
+    db_session.commit()
+    assert auth_client.get(f"/jobs/{job.id}").status_code == 404
+    assert anonymous_client.get(f"/jobs/{job.id}").status_code == 401
+
+def test_failed_attempts_are_retried_with_backoff(auth_client, worker, monkeypatch, db_session):
+    def flaky(context):
+        raise RuntimeError(f"attempt {context.attempt}")
+    monkeypatch.setitem(JOB_HANDLERS, "demo", flaky)
+    job_url = auth_client.get("/init-task").json()["status_url"]
+
+    assert worker.run_once() is True
+    job = auth_client.get(job_url).json()
+    assert (job["status"], job["attempts"], job["error"]) == ("queued", 1, "RuntimeError: attempt 1")
+    # backing off, nothing is due yet
+    assert worker.run_once() is False
+
+    for _ in range(2):
+        db_session.execute(update(JobModel).filter_by(status="queued").values(run_at=utcnow()))
+        db_session.commit()
+        assert worker.run_once() is True
+    job = auth_client.get(job_url).json()
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", 3, "RuntimeError: attempt 3")
+
+def test_stale_running_jobs_are_reclaimed(db_session):
+    job = JobModel(name="demo", payload={}, max_attempts=3, run_at=utcnow(), status="running", attempts=1,
+                   locked_by="dead-worker", locked_at=utcnow() - timedelta(days=1))
+    db_session.add(job)
+    db_session.commit()
+    with TestSessionLocal() as db:
+        claimed = claim_job(db, "live-worker")
+    assert (claimed.id, claimed.locked_by, claimed.attempts) == (job.id, "live-worker", 2)
+    with TestSessionLocal() as db:
+        assert claim_job(db, "other-worker") is None
+    db_session.delete(db_session.get(JobModel, job.id))
+    db_session.commit()
+
+def test_periodic_jobs_are_enqueued_once_per_key(db_session):
+    with TestSessionLocal() as db:
+        assert enqueue_once(db, "log_time", unique_key="log_time:1") is True
+        assert enqueue_once(db, "log_time", unique_key="log_time:1") is False
+    assert db_session.query(JobModel).filter_by(unique_key="log_time:1").count() == 1
@@ -0,0 +1,34 @@
+from prometheus_client import REGISTRY
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_counted_by_route_template(auth_client, random_task):
+    before = sample("http_requests_total", method="GET", route="/todos/tasks/{task_id}", status="200")
+    auth_client.get(f"/todos/tasks/{random_task.id}")
+    after = sample("http_requests_total", method="GET", route="/todos/tasks/{task_id}", status="200")
+    assert after == before + 1
+    assert sample("http_request_duration_seconds_count", method="GET", route="/todos/tasks/{task_id}") >= 1
+
+def test_unmatched_paths_share_one_label(anonymous_client):
+    before = sample("http_requests_total", method="GET", route="<unmatched>", status="404")
+    anonymous_client.get("/no/such/path/123")
+    anonymous_client.get("/no/such/path/456")
+    assert sample("http_requests_total", method="GET", route="<unmatched>", status="404") == before + 2
+
+def test_auth_failures_by_reason(anonymous_client):
+    before = sample("auth_failures_total", reason="missing_credentials")
+    anonymous_client.get("/todos/tasks")
+    assert sample("auth_failures_total", reason="missing_credentials") == before + 1
+
+    before = sample("auth_failures_total", reason="decode_error")
+    anonymous_client.get("/todos/tasks", headers={"Authorization": "Bearer not-a-jwt"})
+    assert sample("auth_failures_total", reason="decode_error") == before + 1
+
+def test_metrics_endpoint(anonymous_client):
+    response = anonymous_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_requests_in_progress" in response.text
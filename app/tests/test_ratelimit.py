@@ -0,0 +1,71 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.auth.jwt_auth import generate_access_token
+from app.core.config import settings
+from app.core.ratelimit import BackendBucketStore, LoadSheddingMiddleware, MemoryBucketStore, RateLimit, rate_limiter
+
+
+@pytest.fixture()
+def limiter(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "store", MemoryBucketStore())
+    monkeypatch.setattr(rate_limiter, "default", RateLimit.parse("3/minute"))
+    rate_limiter.routes = {"POST /users/login": "2/minute"}
+    yield rate_limiter
+    rate_limiter.routes = settings.RATE_LIMIT_ROUTES
+
+
+def test_route_budget_returns_429_with_retry_after(limiter, anonymous_client):
+    credentials = {"username": "nobody", "password": "wrong"}
+    assert [anonymous_client.post("/users/login", json=credentials).status_code for _ in range(2)] == [401, 401]
+    response = anonymous_client.post("/users/login", json=credentials)
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+    assert response.json()["status_code"] == 429
+    # other routes draw from the default budget
+    assert anonymous_client.get("/todos/tasks").status_code == 401
+
+def test_buckets_are_per_user(limiter, auth_client, anonymous_client):
+    for _ in range(3):
+        assert auth_client.get("/todos/tasks").status_code == 200
+    assert auth_client.get("/todos/tasks").status_code == 429
+    # another user behind the same address keeps its own budget
+    other_user = {"Authorization": f"Bearer {generate_access_token(10 ** 6)}"}
+    assert anonymous_client.get("/todos/tasks", headers=other_user).status_code == 401
+
+def test_backend_store_is_shared(shared_backend):
+    limit = RateLimit.parse("2/hour")
+    worker_a, worker_b = BackendBucketStore(shared_backend), BackendBucketStore(shared_backend)
+
+    async def take_all():
+        return [await store.take("ratelimit:test:ip:1", limit) for store in (worker_a, worker_b, worker_a)]
+
+    waits = asyncio.run(take_all())
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(1800, rel=0.01)
+
+def test_load_shedding_rejects_beyond_max_in_flight():
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    app.add_middleware(LoadSheddingMiddleware, max_in_flight=1)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/slow"))
+            await asyncio.sleep(0.05)
+            shed = await client.get("/slow")
+            release.set()
+            return (await first), shed
+
+    first, shed = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from main import app
+from app.core.database import Base, get_async_database_url, get_async_replica_db
+from app.core.replica import read_your_writes
+from app.tasks.models import TaskModel
+from app.users.models import UserModel
+
+
+REPLICA_DATABASE_URI = 'sqlite:///file:replicadb?mode=memory&cache=shared&uri=true'
+
+
+@pytest.fixture(scope='function')
+def replica(db_session, shared_backend):
+    """A second database standing in for a lagging replica: it only has one task of test_user."""
+    user = db_session.query(UserModel).filter_by(username="test_user").first()
+    engine = create_engine(REPLICA_DATABASE_URI, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(TaskModel.__table__.insert(), {"user_id": user.id, "title": "only on the replica",
+                                                          "is_completed": False})
+    async_engine = create_async_engine(get_async_database_url(REPLICA_DATABASE_URI), poolclass=StaticPool)
+    session_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def override_get_async_replica_db():
+        async with session_factory() as db:
+            yield db
+
+    previous = app.dependency_overrides.get(get_async_replica_db)
+    app.dependency_overrides[get_async_replica_db] = override_get_async_replica_db
+    read_your_writes.backend = shared_backend
+    yield
+    read_your_writes.backend = None
+    app.dependency_overrides[get_async_replica_db] = previous
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def titles(response):
+    return [task["title"] for task in response.json()]
+
+
+def test_reads_use_replica_until_own_write(auth_client, replica, shared_backend):
+    assert titles(auth_client.get("todos/tasks", params={"limit": 50})) == ["only on the replica"]
+
+    payload = {"title": "written to the primary", "is_completed": False}
+    task_id = auth_client.post("todos/tasks", json=payload).json()["id"]
+    # read-your-writes window: served by the primary
+    assert "written to the primary" in titles(auth_client.get("todos/tasks", params={"limit": 50}))
+    assert auth_client.get(f"todos/tasks/{task_id}").status_code == 200
+
+    # window over: back on the replica
+    shared_backend.store.clear()
+    assert titles(auth_client.get("todos/tasks", params={"limit": 49})) == ["only on the replica"]
+    auth_client.delete(f"todos/tasks/{task_id}")
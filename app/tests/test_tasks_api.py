@@ -14,4 +14,112 @@ def test_tasks_detail_response_200(auth_client, random_task):
 
 def test_tasks_detail_response_401(auth_client):
     response = auth_client.get(f"todos/tasks/1000")
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+def test_tasks_create_update_delete(auth_client):
+    payload = {"title": "write the async layer", "description": "port routes", "is_completed": False}
+    response = auth_client.post("todos/tasks", json=payload)
+    assert response.status_code == 200
+    task_id = response.json()["id"]
+
+    payload["is_completed"] = True
+    response = auth_client.put(f"todos/tasks/{task_id}", json=payload)
+    assert response.status_code == 200
+    assert response.json()["is_completed"] is True
+
+    response = auth_client.delete(f"todos/tasks/{task_id}")
+    assert response.status_code == 204
+    response = auth_client.get(f"todos/tasks/{task_id}")
+    assert response.status_code == 404
+
+
+def test_tasks_list_cursor_pagination(auth_client):
+    offset_ids = [task["id"] for task in auth_client.get("todos/tasks", params={"limit": 50}).json()]
+
+    cursor_ids, params = [], {"limit": 3, "pagination": "cursor"}
+    while True:
+        response = auth_client.get("todos/tasks", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        cursor_ids += [task["id"] for task in page["items"]]
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert cursor_ids == offset_ids
+
+def test_tasks_list_invalid_cursor_response_400(auth_client):
+    response = auth_client.get("todos/tasks", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_tasks_batch_create_update_delete(auth_client):
+    items = [{"title": f"batch task number {i}", "is_completed": False} for i in range(3)]
+    response = auth_client.post("todos/tasks:batch", json={"items": items + [{"title": "bad"}]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status_code"] for result in results] == [201, 201, 201, 422]
+    ids = [result["id"] for result in results[:3]]
+    assert [result["task"]["title"] for result in results[:3]] == [item["title"] for item in items]
+
+    updates = [{"id": task_id, "title": "batch task updated", "is_completed": True} for task_id in ids]
+    response = auth_client.patch("todos/tasks:batch", json={"items": updates + [{**updates[0], "id": 100000}]})
+    results = response.json()["results"]
+    assert [result["status_code"] for result in results] == [200, 200, 200, 404]
+    assert all(result["task"]["is_completed"] for result in results[:3])
+
+    response = auth_client.request("DELETE", "todos/tasks:batch", json={"ids": ids + [100000]})
+    results = response.json()["results"]
+    assert [result["status_code"] for result in results] == [204, 204, 204, 404]
+    assert auth_client.get(f"todos/tasks/{ids[0]}").status_code == 404
+
+
+def test_tasks_writes_use_single_statement(auth_client, query_counter):
+    # warm the principal cache so only the write statements are counted
+    auth_client.get("todos/tasks")
+    payload = {"title": "one statement per write", "is_completed": False}
+
+    # one statement for the task plus the user_task_stats upsert
+    query_counter.clear()
+    task_id = auth_client.post("todos/tasks", json=payload).json()["id"]
+    assert len(query_counter) == 2
+
+    query_counter.clear()
+    response = auth_client.put(f"todos/tasks/{task_id}", json={**payload, "is_completed": True})
+    assert response.json()["is_completed"] is True
+    assert len(query_counter) == 2
+
+    query_counter.clear()
+    assert auth_client.delete(f"todos/tasks/{task_id}").status_code == 204
+    assert len(query_counter) == 2
+
+    query_counter.clear()
+    assert auth_client.delete(f"todos/tasks/{task_id}").status_code == 404
+    assert len(query_counter) == 1
+
+
+def test_tasks_conditional_get_response_304(auth_client, random_task, query_counter):
+    etags = {}
+    for url in ("todos/tasks", f"todos/tasks/{random_task.id}"):
+        response = auth_client.get(url)
+        etag = etags[url] = response.headers["ETag"]
+
+        query_counter.clear()
+        response = auth_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert query_counter == []
+
+    payload = {"title": "changes the etag", "is_completed": False}
+    task_id = auth_client.post("todos/tasks", json=payload).json()["id"]
+    response = auth_client.get("todos/tasks", headers={"If-None-Match": etags["todos/tasks"]})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etags["todos/tasks"]
+    auth_client.delete(f"todos/tasks/{task_id}")
+
+
+def test_task_rows_to_json_matches_response_schema():
+    from app.benchmarks.serialization import build_page, pydantic_dump_path
+    from app.tasks.schemas import task_rows_to_json
+    rows, objects = build_page(50)
+    assert task_rows_to_json(rows) == pydantic_dump_path(objects)
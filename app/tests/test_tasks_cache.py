@@ -0,0 +1,42 @@
+import pytest
+from app.tasks.cache import task_cache
+
+
+@pytest.fixture(scope='function', params=["in_memory", "shared"])
+def cache_backend(request, shared_backend):
+    if request.param == "shared":
+        task_cache.backend = shared_backend
+    yield task_cache
+    task_cache.backend = None
+
+
+def test_tasks_list_cache_hit_and_invalidation(auth_client, cache_backend):
+    params = {"limit": 50, "completed": False}
+    first = auth_client.get("todos/tasks", params=params)
+    second = auth_client.get("todos/tasks", params=params)
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+    payload = {"title": "invalidates the list cache", "is_completed": False}
+    task_id = auth_client.post("todos/tasks", json=payload).json()["id"]
+    response = auth_client.get("todos/tasks", params=params)
+    assert response.headers["X-Cache"] == "MISS"
+    assert task_id in [task["id"] for task in response.json()]
+    auth_client.delete(f"todos/tasks/{task_id}")
+
+
+def test_tasks_detail_cache_invalidated_by_update(auth_client, cache_backend, random_task):
+    url = f"todos/tasks/{random_task.id}"
+    auth_client.get(url)
+    cached = auth_client.get(url)
+    assert cached.headers["X-Cache"] == "HIT"
+
+    hits = auth_client.get("internal/cache").json()["tasks"]["hits"]
+    assert hits >= 1
+
+    payload = {"title": cached.json()["title"], "is_completed": not cached.json()["is_completed"]}
+    auth_client.put(url, json=payload)
+    response = auth_client.get(url)
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()["is_completed"] == payload["is_completed"]
+    auth_client.put(url, json={**payload, "is_completed": cached.json()["is_completed"]})
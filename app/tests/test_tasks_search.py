@@ -0,0 +1,55 @@
+import pytest
+from app.tasks.models import TaskModel
+from app.users.models import UserModel
+
+
+@pytest.fixture()
+def search_tasks(auth_client, db_session):
+    created = []
+    for title, description in [
+        ("quokka feeding schedule", "feed the quokka twice, quokka food is in the shed"),
+        ("buy groceries", "milk, bread and a treat for the quokka"),
+        ("call the plumber", "kitchen sink leaks"),
+    ]:
+        response = auth_client.post("/todos/tasks", json={"title": title, "description": description,
+                                                          "is_completed": False})
+        created.append(response.json()["id"])
+    other = UserModel(username="search_other_user")
+    other.set_password("123")
+    db_session.add(other)
+    db_session.flush()
+    db_session.add(TaskModel(user_id=other.id, title="quokka of someone else", description="quokka"))
+    db_session.commit()
+    yield created
+    for task_id in created:
+        auth_client.delete(f"/todos/tasks/{task_id}")
+    db_session.query(TaskModel).filter_by(user_id=other.id).delete()
+    db_session.delete(other)
+    db_session.commit()
+
+
+def test_search_is_ranked_and_user_scoped(auth_client, search_tasks):
+    response = auth_client.get("/todos/tasks/search", params={"q": "quokka"})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == search_tasks[:2]
+    assert response.json()["next_cursor"] is None
+
+def test_search_cursor_pagination(auth_client, search_tasks):
+    first = auth_client.get("/todos/tasks/search", params={"q": "quokka", "limit": 1}).json()
+    assert first["next_cursor"] is not None
+    second = auth_client.get("/todos/tasks/search",
+                             params={"q": "quokka", "limit": 1, "cursor": first["next_cursor"]}).json()
+    assert [item["id"] for item in first["items"] + second["items"]] == search_tasks[:2]
+    assert second["next_cursor"] is None
+
+def test_search_follows_updates_and_deletes(auth_client, search_tasks):
+    auth_client.put(f"/todos/tasks/{search_tasks[2]}", json={"title": "call the quokka vet", "is_completed": False})
+    auth_client.delete(f"/todos/tasks/{search_tasks[0]}")
+    response = auth_client.get("/todos/tasks/search", params={"q": "quokka"})
+    assert sorted(item["id"] for item in response.json()["items"]) == sorted(search_tasks[1:])
+
+def test_search_input_is_not_query_syntax(auth_client, search_tasks):
+    response = auth_client.get("/todos/tasks/search", params={"q": 'sink" OR (NEAR'})
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+    assert auth_client.get("/todos/tasks/search", params={"q": "!!!"}).json()["items"] == []
@@ -0,0 +1,48 @@
+from sqlalchemy import func, select, update
+from app.tasks.models import TaskModel
+from app.tasks.stats import rebuild_task_stats
+from app.users.models import UserModel
+
+
+def actual_stats(db_session):
+    user = db_session.query(UserModel).filter_by(username="test_user").one()
+    total, completed = db_session.execute(
+        select(func.count(), func.count().filter(TaskModel.is_completed)).where(TaskModel.user_id == user.id)).one()
+    return {"total": total, "completed": completed, "pending": total - completed}
+
+
+def test_stats_follow_every_write(auth_client, db_session):
+    assert auth_client.get("/todos/tasks/stats").json() == actual_stats(db_session)
+
+    task = auth_client.post("/todos/tasks", json={"title": "stats task", "is_completed": False}).json()
+    auth_client.put(f"/todos/tasks/{task['id']}", json={"title": "stats task", "is_completed": True})
+    # not a flip, the counters must not move twice
+    auth_client.put(f"/todos/tasks/{task['id']}", json={"title": "stats task again", "is_completed": True})
+    assert auth_client.get("/todos/tasks/stats").json() == actual_stats(db_session)
+
+    created = auth_client.post("/todos/tasks:batch", json={"items": [
+        {"title": "stats batch one", "is_completed": True},
+        {"title": "stats batch two", "is_completed": False},
+    ]}).json()["results"]
+    ids = [result["id"] for result in created]
+    auth_client.patch("/todos/tasks:batch", json={"items": [
+        {"id": ids[0], "title": "stats batch one", "is_completed": False},
+        {"id": ids[1], "title": "stats batch two", "is_completed": True},
+        {"id": ids[1], "title": "stats batch two", "is_completed": True},
+    ]})
+    assert auth_client.get("/todos/tasks/stats").json() == actual_stats(db_session)
+
+    auth_client.delete(f"/todos/tasks/{task['id']}")
+    auth_client.request("DELETE", "/todos/tasks:batch", json={"ids": ids})
+    assert auth_client.get("/todos/tasks/stats").json() == actual_stats(db_session)
+
+def test_rebuild_reconciles_drift(auth_client, db_session):
+    user = db_session.query(UserModel).filter_by(username="test_user").one()
+    task = db_session.query(TaskModel).filter_by(user_id=user.id).first()
+    # a write behind the API's back
+    db_session.execute(update(TaskModel).filter_by(id=task.id).values(is_completed=not task.is_completed))
+    db_session.commit()
+    assert auth_client.get("/todos/tasks/stats").json() != actual_stats(db_session)
+
+    assert rebuild_task_stats(db_session, [user.id]) == 1
+    assert auth_client.get("/todos/tasks/stats").json() == actual_stats(db_session)
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from app.auth.bearer_auth import get_current_username
+from app.auth.tokens import RevocationList, sweep_tokens, utcnow
+from app.users.models import RevokedTokenModel, TokenModel, UserModel
+from tests.conftest import TestAsyncSessionLocal
+
+
+def login(anonymous_client):
+    return anonymous_client.post("/users/login", json={"username": "test_user", "password": "123"}).json()
+
+
+def test_logout_revokes_access_and_refresh_token(anonymous_client):
+    tokens = login(anonymous_client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert anonymous_client.get("/todos/tasks", headers=headers).status_code == 200
+
+    response = anonymous_client.post("/users/logout", headers=headers,
+                                     json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 204
+    response = anonymous_client.get("/todos/tasks", headers=headers)
+    assert (response.status_code, response.json()["detail"]) == (401, "Authentication failed: token revoked.")
+    assert anonymous_client.post("/users/refresh-token", json={"token": tokens["refresh_token"]}).status_code == 401
+
+    # a fresh login is unaffected
+    headers = {"Authorization": f"Bearer {login(anonymous_client)['access_token']}"}
+    assert anonymous_client.get("/todos/tasks", headers=headers).status_code == 200
+
+def test_other_workers_load_revocations(anonymous_client):
+    tokens = login(anonymous_client)
+    anonymous_client.post("/users/logout", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    other_worker = RevocationList(sync_seconds=60)
+
+    async def sync():
+        async with TestAsyncSessionLocal() as db:
+            await other_worker.sync(db)
+
+    asyncio.run(sync())
+    import jwt
+    jti = jwt.decode(tokens["access_token"], options={"verify_signature": False})["jti"]
+    assert other_worker.is_revoked(jti)
+
+def test_bearer_lookup_is_one_joined_query(db_session, query_counter):
+    user = db_session.query(UserModel).filter_by(username="test_user").one()
+    db_session.add_all([TokenModel(user_id=user.id, token="live-token"),
+                        TokenModel(user_id=user.id, token="old-token", expires_at=utcnow() - timedelta(days=1))])
+    db_session.commit()
+
+    async def lookup(token):
+        async with TestAsyncSessionLocal() as db:
+            return await get_current_username(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+
+    assert asyncio.run(lookup("live-token")).id == user.id
+    assert len(query_counter) == 1
+    with pytest.raises(HTTPException):
+        asyncio.run(lookup("old-token"))
+    db_session.query(TokenModel).delete()
+    db_session.commit()
+
+def test_sweeper_deletes_expired_rows_in_batches(db_session):
+    user = db_session.query(UserModel).filter_by(username="test_user").one()
+    expired = utcnow() - timedelta(minutes=1)
+    db_session.add_all([TokenModel(user_id=user.id, token=f"expired-{i}", expires_at=expired) for i in range(5)])
+    db_session.add(TokenModel(user_id=user.id, token="still-valid"))
+    db_session.add(RevokedTokenModel(jti="expired-jti", expires_at=expired))
+    db_session.commit()
+
+    assert sweep_tokens(db_session, batch_size=2) == {"tokens": 5, "revoked_tokens": 1}
+    assert [token.token for token in db_session.query(TokenModel)] == ["still-valid"]
+    db_session.query(TokenModel).delete()
+    db_session.commit()
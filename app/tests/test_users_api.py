@@ -31,3 +31,30 @@ def test_register_response_201(anonymous_client):
     }
     response = anonymous_client.post("/users/register", json=payload)
     assert response.status_code == 201
+
+def test_login_hasher_saturated_response_503(anonymous_client, monkeypatch):
+    from app.auth.hashing import password_hasher
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    payload = {
+        "username": "test_user",
+        "password": "123"
+    }
+    response = anonymous_client.post("/users/login", json=payload)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_deactivated_user_invalidates_principal_cache(auth_client, db_session):
+    from app.auth.principal import principal_cache
+    from app.users.models import UserModel
+    user = db_session.query(UserModel).filter_by(username="test_user").first()
+    assert auth_client.get("todos/tasks").status_code == 200
+    assert principal_cache.get(user.id) is not None
+
+    user.is_active = False
+    db_session.commit()
+    assert principal_cache.get(user.id) is None
+    assert auth_client.get("todos/tasks").status_code == 403
+
+    user.is_active = True
+    db_session.commit()
+    assert auth_client.get("todos/tasks").status_code == 200
@@ -0,0 +1,102 @@
+import asyncio
+import httpx
+import pytest
+from app.core.http import CircuitBreaker
+from app.weather import service as weather_module
+from app.weather.service import WeatherService, WeatherUnavailable
+from main import app
+
+
+class Upstream:
+    """httpx.MockTransport handler counting the calls; fails with 500 while `failing`."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+        self.temperature = 20.0
+
+    async def __call__(self, request):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.failing:
+            return httpx.Response(500)
+        return httpx.Response(200, json={"current": {"temperature_2m": self.temperature,
+                                                     "latitude": float(request.url.params["latitude"])}})
+
+
+@pytest.fixture()
+def upstream():
+    return Upstream()
+
+
+@pytest.fixture()
+def weather(shared_backend, monkeypatch):
+    service = WeatherService("https://weather.test/v1/forecast", fresh_seconds=60, stale_seconds=900, decimals=2,
+                             breaker=CircuitBreaker(failures=3, reset_seconds=30), backend=shared_backend)
+    monkeypatch.setattr("app.weather.routes.weather_service", service)
+    return service
+
+
+def client_for(upstream):
+    return httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+
+
+def test_concurrent_misses_make_one_upstream_call(weather, upstream):
+    async def scenario():
+        async with client_for(upstream) as client:
+            # all of them round to the same location
+            return await asyncio.gather(*[weather.current(client, 52.5201 + i / 10000, 13.405) for i in range(10)])
+
+    results = asyncio.run(scenario())
+    assert upstream.calls == 1
+    assert {state for _, state in results} == {"MISS"}
+    assert results[0][0]["latitude"] == 52.52
+
+def test_stale_entries_are_served_while_revalidating(weather, upstream, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(weather_module.time, "time", lambda: now[0])
+
+    async def scenario():
+        async with client_for(upstream) as client:
+            states = [(await weather.current(client, 1, 2))[1], (await weather.current(client, 1, 2))[1]]
+            now[0] += 120
+            upstream.temperature = 25.0
+            stale, state = await weather.current(client, 1, 2)
+            states.append(state)
+            await asyncio.gather(*weather._refreshes)
+            fresh, state = await weather.current(client, 1, 2)
+            states.append(state)
+            return states, stale, fresh
+
+    states, stale, fresh = asyncio.run(scenario())
+    assert states == ["MISS", "HIT", "STALE", "HIT"]
+    assert (stale["temperature_2m"], fresh["temperature_2m"]) == (20.0, 25.0)
+    assert upstream.calls == 2
+
+def test_circuit_breaker_stops_calling_a_failing_upstream(weather, upstream):
+    upstream.failing = True
+
+    async def scenario():
+        async with client_for(upstream) as client:
+            for latitude in range(5):
+                with pytest.raises(WeatherUnavailable):
+                    await weather.current(client, latitude, 0)
+
+    asyncio.run(scenario())
+    assert upstream.calls == 3
+    assert weather.breaker.state == "open"
+
+def test_endpoint_uses_the_shared_client(weather, upstream, anonymous_client):
+    app.state.http_client = client_for(upstream)
+    try:
+        response = anonymous_client.get("/fetch-current-weather", params={"latitude": 10, "longitude": 20})
+        assert response.status_code == 200
+        assert response.headers["X-Cache"] == "MISS"
+        assert response.json()["current_weather"]["temperature_2m"] == 20.0
+
+        upstream.failing = True
+        response = anonymous_client.get("/fetch-current-weather", params={"latitude": 11, "longitude": 20})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "30"
+    finally:
+        del app.state.http_client
@@ -2,6 +2,8 @@ from sqlalchemy import Column, String, Text, Boolean, func, Integer, DateTime, F
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from passlib.context import CryptContext
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -29,12 +31,29 @@ class UserModel(Base):
         self.password = pwd_context.hash(plain_password)
 
 
+def token_expiry() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=settings.TOKEN_EXPIRE_SECONDS)
+
+
 class TokenModel(Base):
     __tablename__ = 'tokens'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey('users.id'))
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
     token = Column(String, nullable=False, unique=True)
+    # naive UTC, rows past it are rejected and deleted by the sweep_tokens job; null never expires
+    expires_at = Column(DateTime, nullable=True, index=True, default=token_expiry)
     created_date = Column(DateTime, nullable=False, server_default=func.now())
 
-    user = relationship('UserModel', back_populates='tokens')
\ No newline at end of file
+    user = relationship('UserModel', back_populates='tokens')
+
+
+class RevokedTokenModel(Base):
+    """jti of revoked JWTs, kept until the token would have expired anyway."""
+    __tablename__ = 'revoked_tokens'
+
+    # increasing, lets every worker load only the revocations it has not seen yet
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    jti = Column(String(64), nullable=False, unique=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_date = Column(DateTime, nullable=False, server_default=func.now())
\ No newline at end of file
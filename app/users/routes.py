@@ -1,12 +1,21 @@
 from fastapi import APIRouter, Path, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from app.core.responses import AppJSONResponse
 from app.users.schemas import *
 from app.users.models import UserModel, TokenModel
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from typing import List
 import secrets
-from app.auth.jwt_auth import generate_access_token, generate_refresh_token, decode_refresh_token
+from app.auth.jwt_auth import generate_access_token, generate_refresh_token, decode_refresh_token, \
+    get_authenticated_user, security
+from app.auth.principal import Principal
+from app.auth.tokens import revocation_list, revoke
+from fastapi.security import HTTPAuthorizationCredentials
+from typing import Optional
+import jwt
+from app.core.config import settings
+from app.auth.hashing import password_hasher
 
 
 router = APIRouter(tags=["users"], prefix="/users")
@@ -17,33 +26,57 @@ def generate_token(length = 32):
 
 
 @router.post("/login")
-async def user_login(request: UserLoginSchema, db: Session = Depends(get_db)):
-    user_object = db.query(UserModel).filter_by(username=request.username.lower()).first()
+async def user_login(request: UserLoginSchema, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(UserModel).filter_by(username=request.username.lower()))
+    user_object = result.scalars().first()
     if not user_object:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User does not exist")
-    if not user_object.verify_password(request.password):
+    if not await password_hasher.verify(request.password, user_object.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Password is invalid")
     access_token = generate_access_token(user_object.id)
     refresh_token = generate_refresh_token(user_object.id)
-    return JSONResponse(status_code=status.HTTP_200_OK,
+    return AppJSONResponse(status_code=status.HTTP_200_OK,
                         content={"detail": "user object successfully login",
                                  "access_token": access_token,
                                  "refresh_token": refresh_token})
 
 
 @router.post("/register")
-async def user_register(request: UserRegisterSchema, db: Session = Depends(get_db)):
-    if db.query(UserModel).filter_by(username=request.username.lower()).one_or_none():
+async def user_register(request: UserRegisterSchema, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(UserModel).filter_by(username=request.username.lower()))
+    if result.scalars().one_or_none():
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User already exists")
     user_object = UserModel(username=request.username.lower())
-    user_object.set_password(request.password)
+    user_object.password = await password_hasher.hash(request.password)
     db.add(user_object)
-    db.commit()
-    return JSONResponse(status_code=status.HTTP_201_CREATED, content="user object successfully registered")
+    await db.commit()
+    return AppJSONResponse(status_code=status.HTTP_201_CREATED, content="user object successfully registered")
 
 
 @router.post("/refresh-token")
-async def user_refresh_register(request: UserRefreshTokenSchema):
+async def user_refresh_register(request: UserRefreshTokenSchema, db: AsyncSession = Depends(get_async_db)):
+    await revocation_list.sync(db)
     user_id = decode_refresh_token(request.token)
     access_token = generate_access_token(user_id)
-    return JSONResponse(content={"access_token": access_token})
+    return AppJSONResponse(content={"access_token": access_token})
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def user_logout(request: Optional[UserLogoutSchema] = None,
+                      credentials: HTTPAuthorizationCredentials = Depends(security),
+                      db: AsyncSession = Depends(get_async_db),
+                      user: Principal = Depends(get_authenticated_user)):
+    # the access token was verified by get_authenticated_user
+    tokens = [jwt.decode(credentials.credentials, settings.JWT_SECRET_KEY, algorithms=["HS256"])]
+    if request and request.refresh_token:
+        try:
+            tokens.append(jwt.decode(request.refresh_token, settings.JWT_SECRET_KEY, algorithms=["HS256"]))
+        except jwt.PyJWTError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid refresh token")
+        if tokens[-1].get("id") != user.id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid refresh token")
+    for claims in tokens:
+        # tokens issued before jti existed cannot be revoked, they run out on their own
+        if claims.get("jti"):
+            await revoke(db, claims["jti"], claims["exp"])
+    await db.commit()
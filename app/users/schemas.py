@@ -22,3 +22,7 @@ class UserRegisterSchema(BaseModel):
 
 class UserRefreshTokenSchema(BaseModel):
     token: str = Field(..., description="Refresh token of the user")
+
+
+class UserLogoutSchema(BaseModel):
+    refresh_token: Optional[str] = Field(None, description="Refresh token to revoke along with the access token")
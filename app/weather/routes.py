@@ -0,0 +1,22 @@
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from app.core.http import get_http_client
+from app.weather.service import WeatherUnavailable, weather_service
+
+
+router = APIRouter(tags=["weather"])
+
+
+@router.get("/fetch-current-weather", status_code=status.HTTP_200_OK)
+async def fetch_current_weather(latitude: float = Query(40.7128, ge=-90, le=90),
+                                longitude: float = Query(-74.0060, ge=-180, le=180),
+                                client: httpx.AsyncClient = Depends(get_http_client)):
+    try:
+        current_weather, cache_state = await weather_service.current(client, latitude, longitude)
+    except WeatherUnavailable:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="failed to fetch current weather.",
+                            headers={"Retry-After": "30"})
+    return JSONResponse(status_code=status.HTTP_200_OK, content={"current_weather": current_weather},
+                        headers={"X-Cache": cache_state})
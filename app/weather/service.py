@@ -0,0 +1,109 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Optional, Tuple
+import httpx
+from fastapi_cache import FastAPICache
+from fastapi_cache.types import Backend
+from app.core.config import settings
+from app.core.http import CircuitBreaker, CircuitOpenError, SingleFlight
+from app.core.responses import dump_json
+
+
+logger = logging.getLogger("app.weather")
+
+
+class WeatherUnavailable(Exception):
+    pass
+
+
+class WeatherService:
+    """Current weather from open-meteo behind a stale-while-revalidate cache.
+
+    Coordinates are rounded so nearby requests share a cache entry. Within
+    `fresh_seconds` an entry is served as is, until `stale_seconds` it is served
+    while one background call refreshes it, after that (or without an entry) the
+    request waits for the upstream. Upstream calls for one location are coalesced
+    and go through a circuit breaker.
+    """
+
+    def __init__(self, url: str, fresh_seconds: int, stale_seconds: int, decimals: int,
+                 breaker: CircuitBreaker, backend: Optional[Backend] = None):
+        self.url = url
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.decimals = decimals
+        self.breaker = breaker
+        self.single_flight = SingleFlight()
+        self._backend = backend
+        self._refreshes = set()
+
+    @property
+    def backend(self) -> Backend:
+        return self._backend or FastAPICache.get_backend()
+
+    @backend.setter
+    def backend(self, backend: Optional[Backend]) -> None:
+        self._backend = backend
+
+    def location(self, latitude: float, longitude: float) -> Tuple[float, float]:
+        return round(latitude, self.decimals), round(longitude, self.decimals)
+
+    async def fetch(self, client: httpx.AsyncClient, latitude: float, longitude: float) -> dict:
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": "temperature_2m,relative_humidity_2m",
+        }
+        response = await client.get(self.url, params=params)
+        response.raise_for_status()
+        return response.json().get("current", {})
+
+    async def refresh(self, client: httpx.AsyncClient, key: str, latitude: float, longitude: float) -> dict:
+        async def call():
+            current = await self.breaker.call(lambda: self.fetch(client, latitude, longitude))
+            await self.backend.set(key, dump_json({"fetched_at": time.time(), "current": current}),
+                                   self.stale_seconds)
+            return current
+        return await self.single_flight.do(key, call)
+
+    def refresh_in_background(self, client: httpx.AsyncClient, key: str, latitude: float, longitude: float) -> None:
+        if key in self.single_flight:
+            return
+        task = asyncio.ensure_future(self.refresh(client, key, latitude, longitude))
+        # keep a reference until done, the event loop only holds weak ones
+        self._refreshes.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("weather refresh failed: %r", task.exception())
+
+    async def current(self, client: httpx.AsyncClient, latitude: float, longitude: float) -> Tuple[dict, str]:
+        """Returns (current weather, cache state HIT/STALE/MISS); raises WeatherUnavailable."""
+        latitude, longitude = self.location(latitude, longitude)
+        key = f"weather:{latitude}:{longitude}"
+        cached = await self.backend.get(key)
+        entry = json.loads(cached) if cached else None
+        age = time.time() - entry["fetched_at"] if entry else None
+
+        if entry and age < self.fresh_seconds:
+            return entry["current"], "HIT"
+        if entry and age < self.stale_seconds:
+            self.refresh_in_background(client, key, latitude, longitude)
+            return entry["current"], "STALE"
+        try:
+            return await self.refresh(client, key, latitude, longitude), "MISS"
+        except (httpx.HTTPError, ValueError, CircuitOpenError) as e:
+            raise WeatherUnavailable(str(e) or type(e).__name__) from e
+
+
+weather_service = WeatherService(
+    settings.WEATHER_API_URL,
+    fresh_seconds=settings.WEATHER_FRESH_SECONDS,
+    stale_seconds=settings.WEATHER_STALE_SECONDS,
+    decimals=settings.WEATHER_COORDINATE_DECIMALS,
+    breaker=CircuitBreaker(settings.CIRCUIT_BREAKER_FAILURES, settings.CIRCUIT_BREAKER_RESET_SECONDS),
+)